@@ -0,0 +1,96 @@
+from src.cfg import CFGrammar, Terminal
+from src.cfg_learner import CFGLearner
+from src.cfg_parser import CFGParser
+from src.cky_parser import CKYParser
+from src.utils import get_words_from_grammar
+
+from pathlib import Path
+import argparse
+import random
+import time
+
+
+def legacy_accepts(grammar: CFGrammar, word: str) -> bool:
+    # The table-based parser this repository used before the bitset engine.
+    nonterminals = [grammar.start] + list(grammar.nonterminals - {grammar.start})
+    table = [
+        [[False for _ in range(len(nonterminals))] for _ in range(len(word))]
+        for _ in range(len(word))
+    ]
+
+    for char_idx, char in enumerate(word):
+        for rule in grammar.rules:
+            if len(rule.right) == 1 and rule.right[0] == Terminal(char):
+                table[0][char_idx][nonterminals.index(rule.left)] = True
+
+    for l in range(1, len(word)):
+        for s in range(len(word) - l):
+            for p in range(l):
+                for rule in grammar.rules:
+                    if len(rule.right) == 2:
+                        if (
+                            table[p][s][nonterminals.index(rule.right[0])]
+                            and table[l - p - 1][s + p + 1][
+                                nonterminals.index(rule.right[1])
+                            ]
+                        ):
+                            table[l][s][nonterminals.index(rule.left)] = True
+
+    return table[len(word) - 1][0][0]
+
+
+def sample_words(grammar, n_words, max_len, rng):
+    words = get_words_from_grammar(grammar, max_count=n_words)
+    alphabet = sorted({char for word in words for char in word})
+    words += [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, max_len)))
+        for _ in range(n_words)
+    ]
+    return words
+
+
+def bench(name, grammar, words):
+    cky_parser = CKYParser(grammar)
+    cnf = cky_parser.compiled.cnf
+
+    start = time.perf_counter()
+    expected = [legacy_accepts(cnf, word) for word in words]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [cky_parser.accepts(word) for word in words]
+    bitset_time = time.perf_counter() - start
+
+    assert expected == actual, f"results differ on {name}"
+    print(
+        f"{name:<28}{len(cnf.rules):>8}{len(words):>8}"
+        f"{legacy_time:>12.3f}{bitset_time:>12.3f}"
+        f"{legacy_time / max(bitset_time, 1e-9):>10.1f}x"
+    )
+
+
+def main(limit=10, n_words=50, max_len=12, seed=0):
+    rng = random.Random(seed)
+    learner = CFGLearner()
+    print(f"{'grammar':<28}{'rules':>8}{'words':>8}{'legacy, s':>12}{'bitset, s':>12}")
+
+    for path in sorted(Path("tests/generated_grammars").glob("*.txt"))[:limit]:
+        grammar = CFGParser().parse_grammar(path)
+        words = sample_words(grammar, n_words, max_len, rng)
+        bench(path.name, grammar, words)
+
+        # Weak grammars are what the learner actually parses with.
+        weak_cfg = learner.weak_learn(words[:5])
+        bench(f"{path.name} (weak, 5 words)", weak_cfg, words[:n_words])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the bitset CKY parser with the legacy table parser."
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--words", type=int, default=50)
+    parser.add_argument("--max-len", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.limit, args.words, args.max_len, args.seed)
@@ -0,0 +1,84 @@
+from src.cfg import CFGrammar, Nonterminal, Terminal
+from src.cfg_learner import CFGLearner
+from src.cfg_parser import CFGParser
+from src.cky_parser import CKYParser
+from src.earley_parser import EarleyParser
+from src.utils import get_words_from_grammar
+
+from pathlib import Path
+import argparse
+import random
+import time
+
+
+def is_in_cnf(cfg: CFGrammar) -> bool:
+    for rule in cfg.rules:
+        if not rule.right:
+            if rule.left != cfg.start:
+                return False
+        elif len(rule.right) == 1:
+            if not isinstance(rule.right[0], Terminal):
+                return False
+        elif len(rule.right) != 2 or not all(
+            isinstance(sym, Nonterminal) and sym != cfg.start for sym in rule.right
+        ):
+            return False
+    return True
+
+
+def sample_words(words, n_words, max_len, rng):
+    # Sample words, words with one letter dropped and random words over the
+    # same alphabet, so that both accepted and rejected words are checked.
+    alphabet = sorted({char for word in words for char in word})
+    sample = set(words)
+    sample.update(word[:i] + word[i + 1 :] for word in words for i in range(len(word)))
+    sample.update(
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+        for _ in range(n_words)
+    )
+    return sorted(sample)
+
+
+def bench(name, grammar, samples, words):
+    start = time.perf_counter()
+    cnf = CFGrammar.to_chomsky_normal_form(grammar)
+    cnf_time = time.perf_counter() - start
+
+    assert is_in_cnf(cnf), f"{name} is not in CNF"
+    # The Earley parser works on the grammar itself, so the reference does
+    # not go through the conversion under test.
+    expected = EarleyParser(grammar).accepts_many(words)
+    actual = CKYParser(cnf).accepts_many(words)
+    assert (expected == actual).all(), f"languages differ on {name}"
+    assert CKYParser(cnf).accepts_many(samples).all(), f"samples rejected on {name}"
+
+    print(f"{name:<28}{len(grammar.rules):>8}{len(cnf.rules):>10}{cnf_time:>12.3f}")
+
+
+def main(limit=10, n_samples=20, n_words=200, max_len=10, seed=0):
+    rng = random.Random(seed)
+    learner = CFGLearner()
+    print(f"{'grammar':<28}{'rules':>8}{'cnf rules':>10}{'cnf, s':>12}")
+
+    for path in sorted(Path("tests/generated_grammars").glob("*.txt"))[:limit]:
+        grammar = CFGParser().parse_grammar(path)
+        samples = get_words_from_grammar(grammar, max_count=n_samples)
+        words = sample_words(samples, n_words, max_len, rng)
+        bench(path.name, grammar, samples, words)
+
+        # Weak grammars are the largest grammars the learner normalizes.
+        weak_cfg = learner.weak_learn(samples)
+        bench(f"{path.name} (weak, {len(samples)} words)", weak_cfg, samples, words)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the conversion of grammars to Chomsky normal form."
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--max-len", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.limit, args.samples, args.words, args.max_len, args.seed)
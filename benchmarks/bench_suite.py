@@ -0,0 +1,211 @@
+from src.cfg import CFGrammar, FirstFollowTable, Nonterminal, Rule, Terminal
+from src.cfg_learner import CFGLearner
+from src.cfg_parser import CFGParser
+from src.class_products import ClassProducts
+from src.cky_parser import CKYParser
+from src.context_index import ContextIndex
+from src.prime_decomposition import PrimeDecomposition
+from src.utils import get_words_from_grammar
+
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+
+def scaled_grammar(n_nonterminals: int, n_terminals: int = 4) -> CFGrammar:
+    # Every nonterminal derives a terminal or a pair of the next two
+    # nonterminals, so the grammar is dense and accepts words of any length.
+    nonterminals = [Nonterminal(f"[[n{i}]]") for i in range(n_nonterminals)]
+    terminals = [Terminal(chr(ord("a") + i)) for i in range(n_terminals)]
+    rules = [Rule(Nonterminal("S"), [nonterminals[0]])]
+    for i, nt in enumerate(nonterminals):
+        rules.append(Rule(nt, [terminals[i % n_terminals]]))
+        rules.append(
+            Rule(
+                nt,
+                [
+                    nonterminals[(i + 1) % n_nonterminals],
+                    nonterminals[(i + 2) % n_nonterminals],
+                ],
+            )
+        )
+    return CFGrammar(Nonterminal("S"), rules)
+
+
+def random_words(alphabet, length, n_words, rng):
+    return [
+        "".join(rng.choice(alphabet) for _ in range(length)) for _ in range(n_words)
+    ]
+
+
+def measure(fn, repeat):
+    # Time is measured without tracing, which slows Python code down; the
+    # peak memory comes from one more traced run.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"time": best, "peak": peak}
+
+
+def parser_cases(grammars, lengths, n_words, rng):
+    for name, grammar in grammars:
+        alphabet = sorted(
+            {
+                sym.symbol
+                for rule in grammar.rules
+                for sym in rule.right
+                if isinstance(sym, Terminal)
+            }
+        )
+        for length in lengths:
+            words = random_words(alphabet, length, n_words, rng)
+
+            def accepts(grammar=grammar, words=words):
+                cky_parser = CKYParser(grammar)
+                for word in words:
+                    cky_parser.accepts(word)
+
+            yield f"accepts/{name}/len={length}", accepts
+
+            def accepts_earley(grammar=grammar, words=words):
+                earley_parser = CKYParser(grammar, backend="earley")
+                for word in words:
+                    earley_parser.accepts(word)
+
+            yield f"accepts_earley/{name}/len={length}", accepts_earley
+
+
+def grammar_cases(grammars, k):
+    for name, grammar in grammars:
+        yield f"cnf/{name}", lambda g=grammar: CFGrammar.to_chomsky_normal_form(g)
+        # FOLLOW_k sets are built on first use, so they are asked for here.
+        yield f"first_follow/{name}/k={k}", (
+            lambda g=grammar: FirstFollowTable(g, k).follow_sets
+        )
+
+
+def learner_cases(samples):
+    learner = CFGLearner()
+
+    for name, words in samples:
+        index = ContextIndex(words)
+        weak_cfg = learner.weak_learn(words, index)
+        classes = learner._get_congruent_classes(words, weak_cfg, index=index)
+        ids = range(len(classes))
+        prime_ids = learner._prime_ids(classes, ids, ClassProducts())
+        decompositions = learner._decompose_ids(
+            classes, ids, PrimeDecomposition([classes[i] for i in prime_ids])
+        )
+
+        yield f"weak_learn/{name}", lambda w=words: learner.weak_learn(w)
+        yield f"strong_learn/congruent_classes/{name}", (
+            lambda w=words, g=weak_cfg: CFGLearner()._get_congruent_classes(w, g)
+        )
+        yield f"strong_learn/primality/{name}", (
+            lambda c=classes: learner._prime_ids(c, range(len(c)), ClassProducts())
+        )
+        yield f"strong_learn/decomposition/{name}", (
+            lambda c=classes, p=prime_ids: learner._decompose_ids(
+                c, range(len(c)), PrimeDecomposition([c[i] for i in p])
+            )
+        )
+        yield f"strong_learn/branching/{name}", (
+            lambda c=classes, p=prime_ids, d=decompositions: learner._branching_ids(
+                c, p, d, p, ClassProducts()
+            )
+        )
+        yield f"strong_learn/total/{name}", lambda w=words: CFGLearner().strong_learn(w)
+
+
+def compare(results, baseline, threshold, memory_threshold, min_time):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        if result["time"] >= min_time and result["time"] > old["time"] * (
+            1 + threshold
+        ):
+            regressions.append(
+                f"{name}: time {old['time']:.4f} -> {result['time']:.4f}"
+            )
+        if result["peak"] > old["peak"] * (1 + memory_threshold):
+            regressions.append(f"{name}: peak {old['peak']} -> {result['peak']}")
+    return regressions
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    paths = sorted(Path("tests/generated_grammars").glob("*.txt"))[: args.limit]
+    generated = [(path.stem, CFGParser().parse_grammar(path)) for path in paths]
+    scaled = [(f"scaled{n}", scaled_grammar(n)) for n in args.scaled]
+
+    cases = []
+    for name, grammar in generated:
+        cases.append((f"get_words/{name}", lambda g=grammar: get_words_from_grammar(g)))
+
+    words = {name: get_words_from_grammar(grammar) for name, grammar in generated}
+    samples = [(name, words[name][: args.samples]) for name, _ in generated]
+    weak = [(f"weak{name}", CFGLearner().weak_learn(x)) for name, x in samples]
+
+    cases += parser_cases(generated + scaled + weak, args.lengths, args.words, rng)
+    cases += grammar_cases(generated + scaled + weak, args.k)
+    cases += learner_cases(samples)
+
+    results = {}
+    print(f"{'case':<48}{'time, s':>12}{'peak, KiB':>12}")
+    for name, fn in cases:
+        results[name] = measure(fn, args.repeat)
+        result = results[name]
+        print(f"{name:<48}{result['time']:>12.4f}{result['peak'] / 1024:>12.1f}")
+
+    baseline_path = Path(args.baseline)
+    if args.update or not baseline_path.exists():
+        baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"\nBaseline written to {baseline_path}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare(
+        results, baseline, args.threshold, args.memory_threshold, args.min_time
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"\n{len(regressions)} regressions against {baseline_path}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the parser and the learner and compare with a baseline."
+    )
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--scaled", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--k", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default="bench_baseline.json")
+    parser.add_argument("--update", action="store_true", help="rewrite the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--memory-threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="ignore time regressions of cases faster than this, in seconds",
+    )
+    sys.exit(main(parser.parse_args()))
@@ -1,22 +1,37 @@
-from queue import Queue
-from collections import defaultdict
-from copy import deepcopy
+from collections import defaultdict, deque
+from itertools import count
+from weakref import WeakValueDictionary
+import hashlib
 
 
-class Nonterminal:
-    def __init__(self, symbol, mark=None):
-        self.symbol = symbol
-        self.mark = mark
+class Symbol:
+    """
+    Base class of interned grammar symbols. Constructing a symbol returns
+    the canonical instance for its arguments, so symbols compare and hash
+    by identity and carry a small integer `id` that is unique within the
+    process. Symbols no longer referenced anywhere are released.
+    """
 
-    def __eq__(self, other):
-        return (
-            isinstance(other, Nonterminal)
-            and self.symbol == other.symbol
-            and self.mark == other.mark
-        )
+    __slots__ = ("id", "__weakref__")
+    _ids = count()
 
-    def __hash__(self):
-        return hash(self.symbol)
+
+class Nonterminal(Symbol):
+    __slots__ = ("symbol", "mark")
+    _interned = WeakValueDictionary()
+
+    def __new__(cls, symbol, mark=None):
+        nonterminal = cls._interned.get((symbol, mark))
+        if nonterminal is None:
+            nonterminal = super().__new__(cls)
+            nonterminal.symbol = symbol
+            nonterminal.mark = mark
+            nonterminal.id = next(Symbol._ids)
+            nonterminal = cls._interned.setdefault((symbol, mark), nonterminal)
+        return nonterminal
+
+    def __reduce__(self):
+        return Nonterminal, (self.symbol, self.mark)
 
     def __str__(self):
         if self.mark:
@@ -24,49 +39,76 @@ class Nonterminal:
         return self.symbol
 
 
-class Terminal:
-    def __init__(self, symbol):
-        self.symbol = symbol
+class Terminal(Symbol):
+    __slots__ = ("symbol",)
+    _interned = WeakValueDictionary()
 
-    def __eq__(self, other):
-        return isinstance(other, Terminal) and self.symbol == other.symbol
+    def __new__(cls, symbol):
+        terminal = cls._interned.get(symbol)
+        if terminal is None:
+            terminal = super().__new__(cls)
+            terminal.symbol = symbol
+            terminal.id = next(Symbol._ids)
+            terminal = cls._interned.setdefault(symbol, terminal)
+        return terminal
 
-    def __hash__(self):
-        return hash(self.symbol)
+    def __reduce__(self):
+        return Terminal, (self.symbol,)
 
     def __str__(self):
         return self.symbol
 
 
-class Rule:
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
+class Rule(tuple):
+    """
+    A production `left -> right`, stored as the flat tuple
+    `(left, *right)` of interned symbols. Hashing and comparing a rule is
+    a tuple operation over symbol identities, and no per-rule attribute
+    dictionary or right-hand side list is allocated.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, left, right):
+        return super().__new__(cls, (left, *right))
+
+    @property
+    def left(self):
+        return self[0]
+
+    @property
+    def right(self):
+        return self[1:]
 
     def __eq__(self, other):
-        return (
-            isinstance(other, Rule)
-            and self.left == other.left
-            and self.right == other.right
-        )
+        return isinstance(other, Rule) and tuple.__eq__(self, other)
 
-    def __hash__(self):
-        return hash(str(self))
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+    def __reduce__(self):
+        return Rule, (self.left, self.right)
 
     def __str__(self):
         return f'{self.left} -> {" ".join(map(str, self.right))}'
 
 
 class CongruentClass:
-    def __init__(self, words):
-        self.words = words
-        self.rep = str(sorted(words, key=lambda x: (len(x), x))[0])
+    __slots__ = ("words", "rep")
+
+    def __init__(self, words, rep=None):
+        self.words = frozenset(words)
+        if rep is None:
+            rep = min(self.words, key=lambda x: (len(x), x))
+        self.rep = str(rep)
 
     def __eq__(self, other):
         return (
             isinstance(other, CongruentClass)
             and self.rep == other.rep
-            and set(self.words) == set(other.words)
+            and self.words == other.words
         )
 
     def __hash__(self):
@@ -76,12 +118,127 @@ class CongruentClass:
         return f'Representative: {self.rep}\nWords: {" ".join(self.words)}'
 
 
+class FirstFollowTable:
+    """
+    FIRST_k and FOLLOW_k sets of all nonterminals of a grammar, computed
+    by fixed-point iteration over the rules; FOLLOW_k sets are computed on
+    their first use, so a table used for FIRST_k only never builds them.
+    A set holds tuples of at most `k` terminals; FOLLOW_k strings that
+    reach the end of the input finish with the end marker `$`. The grammar
+    is only read, so a table can be built and queried from several threads.
+    """
+
+    END = Terminal("$")
+
+    def __init__(self, grammar: "CFGrammar", k: int):
+        self.k = k
+        self.source_start = grammar.start
+        self.source_rules = list(grammar.rules)
+        self.first_sets = self._get_first_sets(grammar)
+        self._follow_sets = None
+
+    @property
+    def follow_sets(self) -> dict:
+        if self._follow_sets is None:
+            self._follow_sets = self._get_follow_sets()
+        return self._follow_sets
+
+    def is_stale(self, grammar) -> bool:
+        return (
+            grammar.start != self.source_start
+            or len(grammar.rules) != len(self.source_rules)
+            or grammar.rules != self.source_rules
+        )
+
+    def concat(self, prefixes: set, suffixes: set) -> set:
+        if not suffixes:
+            return set()
+        k = self.k
+        result = set()
+        for prefix in prefixes:
+            if len(prefix) >= k:
+                result.add(prefix)
+            else:
+                result.update((prefix + suffix)[:k] for suffix in suffixes)
+        return result
+
+    def first(self, symbols) -> set:
+        result = {()}
+        for sym in symbols:
+            if isinstance(sym, Nonterminal):
+                result = self.concat(result, self.first_sets.get(sym, set()))
+            else:
+                result = self.concat(result, {(sym,)})
+            if not result:
+                break
+        return result
+
+    def follow(self, nonterminal) -> set:
+        return self.follow_sets.get(nonterminal, set())
+
+    def _get_first_sets(self, grammar):
+        self.first_sets = {nt: set() for nt in grammar.get_nonterminals()}
+        rules_using = defaultdict(list)
+        for rule in grammar.rules:
+            for sym in set(rule.right):
+                if isinstance(sym, Nonterminal):
+                    rules_using[sym].append(rule)
+
+        to_process = deque(grammar.rules)
+        queued = set(grammar.rules)
+
+        while to_process:
+            rule = to_process.popleft()
+            queued.discard(rule)
+            new_first = self.first(rule.right) - self.first_sets[rule.left]
+            if new_first:
+                self.first_sets[rule.left] |= new_first
+                for other in rules_using[rule.left]:
+                    if other not in queued:
+                        queued.add(other)
+                        to_process.append(other)
+
+        return self.first_sets
+
+    def _get_follow_sets(self):
+        follow_sets = {nt: set() for nt in self.first_sets}
+        follow_sets[self.source_start] = {(self.END,)}
+
+        # FOLLOW(A) includes FIRST(beta) . FOLLOW(X) for every X -> alpha A beta;
+        # FIRST(beta) does not change, so only FOLLOW(X) is iterated.
+        edges = defaultdict(list)
+        for rule in self.source_rules:
+            for idx, sym in enumerate(rule.right):
+                if isinstance(sym, Nonterminal):
+                    edges[rule.left].append((sym, self.first(rule.right[idx + 1 :])))
+
+        to_process = deque(follow_sets)
+        queued = set(follow_sets)
+
+        while to_process:
+            left = to_process.popleft()
+            queued.discard(left)
+            for nonterminal, first_beta in edges[left]:
+                new_follow = (
+                    self.concat(first_beta, follow_sets[left])
+                    - follow_sets[nonterminal]
+                )
+                if new_follow:
+                    follow_sets[nonterminal] |= new_follow
+                    if nonterminal not in queued:
+                        queued.add(nonterminal)
+                        to_process.append(nonterminal)
+
+        return follow_sets
+
+
 class CFGrammar:
     def __init__(self, start=Nonterminal("S"), rules=None):
         self.start = start
         self.rules = rules or []
-        self.nonterminals = self._get_nonterminals()
+        self.nonterminals = self.get_nonterminals()
         self.rules_by_nonterminals = self._get_rules_by_nonterminals()
+        self._first_follow_tables = {}
 
     def __eq__(self, other):
         return (
@@ -102,11 +259,18 @@ class CFGrammar:
             + "\n".join(map(str, self.rules))
         )
 
+    def fingerprint(self):
+        # Stable across processes and equal for grammars that compare equal.
+        digest = hashlib.sha1(str(self.start).encode("utf-8"))
+        for rule in sorted(set(map(str, self.rules))):
+            digest.update(b"\n" + rule.encode("utf-8"))
+        return digest.hexdigest()
+
     def save(self, path):
         with open(path, mode="w", encoding="utf-8") as file:
             file.write("\n".join(map(str, self.rules)))
 
-    def _get_nonterminals(self):
+    def get_nonterminals(self):
         nonterminals = set()
         for rule in self.rules:
             nonterminals.add(rule.left)
@@ -124,301 +288,289 @@ class CFGrammar:
     def new_nonterminal(self, sym, used_nonterminals, mark=None):
         suffix = 0
         sym = sym.upper()
-        while Nonterminal(sym + str(suffix)) in self.nonterminals | used_nonterminals:
+        while (
+            Nonterminal(sym + str(suffix)) in self.nonterminals
+            or Nonterminal(sym + str(suffix)) in used_nonterminals
+        ):
             suffix += 1
         return Nonterminal(sym + str(suffix), mark)
 
-    def first(self, k, symbols):
-        def cartesian_product(set1, set2, max_num):
-            if not set1:
-                return set2
-            if not set2:
-                return set1
-            return {(a + b)[:max_num] for a in set1 for b in set2}
-
-        def first_rec(k, symbols, visited):
-            if k == 0:
-                return set()
-
-            if not symbols:
-                return {tuple()}
-
-            if isinstance(symbols[0], Terminal):
-                return cartesian_product(
-                    {(symbols[0],)}, first_rec(k - 1, symbols[1:], visited), max_num=k
-                )
-
-            curr_visited = deepcopy(visited)
-            first = set()
+    def first_follow(self, k):
+        table = self._first_follow_tables.get(k)
+        if table is None or table.is_stale(self):
+            table = FirstFollowTable(self, k)
+            self._first_follow_tables[k] = table
+        return table
 
-            for rule in self.rules_by_nonterminals[symbols[0]]:
-                if (
-                    rule.right
-                    and rule.right[0] == symbols[0]
-                    and symbols[0] in curr_visited
-                ):
-                    first |= cartesian_product(
-                        first_rec(k - 1, rule.right, curr_visited),
-                        first_rec(k - 1, symbols[1:], curr_visited),
-                        max_num=k,
-                    )
-                else:
-                    curr_visited.add(symbols[0])
-                    first |= first_rec(k, rule.right + symbols[1:], curr_visited)
-
-            return first
-
-        return first_rec(k, symbols, set())
+    def first(self, k, symbols):
+        if k == 0:
+            return set()
+        return self.first_follow(k).first(symbols)
 
     def follow(self, k, nonterminal):
-        def follow_rec(k, nonterminal):
-            if nonterminal == new_start:
-                return {(Terminal("$"),)}
-
-            if nonterminal in visited:
-                return set()
-            visited.add(nonterminal)
-
-            follow = set()
-
-            for rule in self.rules:
-                if nonterminal in rule.right:
-                    idx = rule.right.index(nonterminal)
-                    previous = rule.right[idx + 1 :]
-                    following = follow_rec(k, rule.left)
-                    if following:
-                        for flw in following:
-                            follow |= self.first(k, previous + list(flw))
-                    elif previous:
-                        follow |= self.first(k, previous)
-
-            return follow
-
-        new_start = self.new_nonterminal(self.start.symbol, set())
-        self.rules.append(Rule(new_start, [self.start]))
-        visited = set()
-        res = follow_rec(k, nonterminal)
-        self.rules.pop()
-
-        return res
+        if k == 0:
+            return set()
+        return set(self.first_follow(k).follow(nonterminal))
 
     @staticmethod
     def remove_long_rules(cfg):
-        used_nonterminals = set()
-        new_rules = []
-
-        def reduce_rule(left, right):
-            if len(right) > 2:
-                new_left = cfg.new_nonterminal(left.symbol, used_nonterminals)
-                used_nonterminals.add(new_left)
-                new_rules.append(Rule(left, [right[0], new_left]))
-                reduce_rule(new_left, right[1:])
-            else:
-                new_rules.append(Rule(left, right))
-
-        for rule in cfg.rules:
-            reduce_rule(rule.left, rule.right)
-
-        return CFGrammar(cfg.start, new_rules)
+        return CNFCompiler(cfg).remove_long_rules().grammar()
 
     @staticmethod
     def get_nullable_nonterminals(cfg):
-        concerned_rules = {nt: [] for nt in cfg.nonterminals}
-        counter = [0] * len(cfg.rules)
-        nullable = set()
-        nullable_to_process = Queue()
-
-        for idx, rule in enumerate(cfg.rules):
-            for sym in rule.right:
-                contains_terminal = False
-                if isinstance(sym, Nonterminal):
-                    concerned_rules[sym].append(idx)
-                    counter[idx] += 1
-                else:
-                    contains_terminal = True
-                if contains_terminal:
-                    counter[idx] = -1
-            if not rule.right:
-                nullable_to_process.put(rule.left)
-
-        while not nullable_to_process.empty():
-            left = nullable_to_process.get()
-            nullable.add(left)
-            for idx in concerned_rules[left]:
-                counter[idx] -= 1
-                if counter[idx] == 0:
-                    nullable_to_process.put(cfg.rules[idx].left)
-
-        return nullable
+        return CNFCompiler(cfg).get_nullable_nonterminals()
 
     @staticmethod
     def remove_nullable_rules(cfg):
-        new_rules = []
-        nullable = CFGrammar.get_nullable_nonterminals(cfg)
-
-        def update_with_combinations(left, right):
-            candidates = Queue()
-            candidates.put(right)
-            while not candidates.empty():
-                rule = Rule(left, candidates.get())
-                if rule not in new_rules and rule.right:
-                    new_rules.append(rule)
-                    for idx, sym in enumerate(rule.right):
-                        if sym in nullable:
-                            candidates.put(rule.right[:idx] + rule.right[idx + 1 :])
+        return CNFCompiler(cfg).remove_nullable_rules().grammar()
 
-        for rule in cfg.rules:
-            update_with_combinations(rule.left, rule.right)
+    @staticmethod
+    def update_start(cfg):
+        return CNFCompiler(cfg).update_start().grammar()
 
-        if cfg.start in nullable:
-            new_start = cfg.new_nonterminal(cfg.start.symbol, set())
-            new_rules.append(Rule(new_start, [cfg.start]))
-            new_rules.append(Rule(new_start, []))
-            return CFGrammar(new_start, new_rules)
+    @staticmethod
+    def remove_unit_rules(cfg):
+        return CNFCompiler(cfg).remove_unit_rules().grammar()
 
-        return CFGrammar(cfg.start, new_rules)
+    @staticmethod
+    def get_generating_nonterminals(cfg):
+        return CNFCompiler(cfg).get_generating_nonterminals()
 
     @staticmethod
-    def update_start(cfg):
-        new_rules = []
-        need_new_start = False
-        for rule in cfg.rules:
-            if cfg.start in rule.right:
-                need_new_start = True
-            new_rules.append(rule)
+    def get_reachable_nonterminals(cfg):
+        return CNFCompiler(cfg).get_reachable_nonterminals()
 
-        if need_new_start:
-            start = cfg.new_nonterminal(cfg.start.symbol, set())
-            new_rules.append(Rule(start, [cfg.start]))
-            return CFGrammar(start, new_rules)
+    @staticmethod
+    def remove_useless_rules(cfg):
+        return CNFCompiler(cfg).remove_useless_rules().grammar()
 
-        return cfg
+    @staticmethod
+    def remove_terminal_rules(cfg):
+        return CNFCompiler(cfg).remove_terminal_rules().grammar()
 
     @staticmethod
-    def remove_unit_rules(cfg):
-        concerned_rules = {nt: set() for nt in cfg.nonterminals}
-        new_rules = []
-        unit_rules = Queue()
-        concerned_unit_rules = set()
+    def to_chomsky_normal_form(cfg):
+        return (
+            CNFCompiler(cfg)
+            .remove_long_rules()
+            .remove_nullable_rules()
+            .update_start()
+            .remove_unit_rules()
+            .remove_useless_rules()
+            .remove_terminal_rules()
+            .grammar()
+        )
 
-        for idx, rule in enumerate(cfg.rules):
-            if len(rule.right) == 1 and isinstance(rule.right[0], Nonterminal):
-                if rule.left != rule.right[0]:
-                    unit_rules.put(rule)
-                    concerned_unit_rules.add(rule)
-                    concerned_rules[rule.left].add(idx)
-            else:
-                new_rules.append(Rule(rule.left, rule.right))
-                concerned_rules[rule.left].add(idx)
 
-        while not unit_rules.empty():
-            unit_rule = unit_rules.get()
+class CNFCompiler:
+    """
+    Conversion of a grammar to Chomsky normal form. The passes rewrite a
+    plain list of rules in place of building an intermediate grammar after
+    each step, deduplicate rules with sets, and share one set of used
+    nonterminals with a counter per base name for fresh nonterminals.
+    Every pass is linear in the size of its input and output.
+    """
 
-            for idx in concerned_rules[unit_rule.right[0]]:
-                new_rule = Rule(unit_rule.left, cfg.rules[idx].right)
+    def __init__(self, cfg):
+        self.start = cfg.start
+        self.rules = list(cfg.rules)
+        self.used_nonterminals = cfg.get_nonterminals() | {cfg.start}
+        self.suffixes = defaultdict(int)
 
-                if new_rule in concerned_unit_rules:
-                    continue
-                if len(new_rule.right) == 1 and isinstance(
-                    new_rule.right[0], Nonterminal
-                ):
-                    if new_rule.left != new_rule.right[0]:
-                        unit_rules.put(new_rule)
-                        concerned_unit_rules.add(new_rule)
-                else:
-                    if new_rule not in new_rules:
-                        new_rules.append(new_rule)
+    def grammar(self):
+        return CFGrammar(self.start, self.rules)
 
-        return CFGrammar(cfg.start, new_rules)
+    def new_nonterminal(self, sym):
+        sym = sym.upper()
+        suffix = self.suffixes[sym]
+        while Nonterminal(sym + str(suffix)) in self.used_nonterminals:
+            suffix += 1
+        self.suffixes[sym] = suffix + 1
+        nonterminal = Nonterminal(sym + str(suffix))
+        self.used_nonterminals.add(nonterminal)
+        return nonterminal
 
-    @staticmethod
-    def get_generating_nonterminals(cfg):
-        concerned_rules = {nt: [] for nt in cfg.nonterminals}
-        counter = [0] * len(cfg.rules)
-        generating_to_process = Queue()
-        generating = set()
+    def _get_rules_by_nonterminals(self):
+        rules_by_nts = defaultdict(list)
+        for rule in self.rules:
+            rules_by_nts[rule.left].append(rule)
+        return rules_by_nts
+
+    def remove_long_rules(self):
+        new_rules = []
 
-        for idx, rule in enumerate(cfg.rules):
+        for rule in self.rules:
+            left, right = rule.left, rule.right
+            if len(right) <= 2:
+                new_rules.append(rule)
+                continue
+            for sym in right[:-2]:
+                new_left = self.new_nonterminal(rule.left.symbol)
+                new_rules.append(Rule(left, [sym, new_left]))
+                left = new_left
+            new_rules.append(Rule(left, right[-2:]))
+
+        self.rules = new_rules
+        return self
+
+    def _propagate(self, initial, counted):
+        # Worklist closure shared by the nullable and generating passes: a
+        # rule fires once all of its counted symbols have been marked.
+        concerned_rules = defaultdict(list)
+        counter = [0] * len(self.rules)
+        marked = set()
+        to_process = deque()
+
+        for idx, rule in enumerate(self.rules):
+            if rule not in initial:
+                continue
             for sym in rule.right:
-                if isinstance(sym, Nonterminal):
+                if sym in counted:
                     concerned_rules[sym].append(idx)
                     counter[idx] += 1
             if counter[idx] == 0:
-                generating_to_process.put(rule.left)
+                to_process.append(rule.left)
 
-        while not generating_to_process.empty():
-            left = generating_to_process.get()
-            generating.add(left)
+        while to_process:
+            left = to_process.popleft()
+            if left in marked:
+                continue
+            marked.add(left)
             for idx in concerned_rules[left]:
                 counter[idx] -= 1
                 if counter[idx] == 0:
-                    generating_to_process.put(cfg.rules[idx].left)
+                    to_process.append(self.rules[idx].left)
+
+        return marked
+
+    def get_nullable_nonterminals(self):
+        candidates = {
+            rule
+            for rule in self.rules
+            if not any(isinstance(sym, Terminal) for sym in rule.right)
+        }
+        return self._propagate(candidates, self.used_nonterminals)
+
+    def get_generating_nonterminals(self):
+        return self._propagate(set(self.rules), self.used_nonterminals)
+
+    def get_reachable_nonterminals(self):
+        rules_by_nts = self._get_rules_by_nonterminals()
+        reachable = {self.start}
+        to_process = deque([self.start])
+
+        while to_process:
+            nonterminal = to_process.popleft()
+            for rule in rules_by_nts[nonterminal]:
+                for sym in rule.right:
+                    if isinstance(sym, Nonterminal) and sym not in reachable:
+                        reachable.add(sym)
+                        to_process.append(sym)
 
-        return generating
+        return reachable
 
-    @staticmethod
-    def get_reachable_nonterminals(cfg):
-        reachable = {cfg.start}
-        visited = {nt: False for nt in cfg.nonterminals}
+    def remove_nullable_rules(self):
+        nullable = self.get_nullable_nonterminals()
+        new_rules = []
+        seen = set()
 
-        def visit(nonterminal):
-            visited[nonterminal] = True
-            for rule in cfg.rules:
-                if rule.left == nonterminal:
-                    for sym in rule.right:
-                        if sym in cfg.nonterminals:
-                            reachable.add(sym)
-                            if not visited[sym]:
-                                visit(sym)
+        for rule in self.rules:
+            candidates = deque([rule.right])
+            while candidates:
+                new_rule = Rule(rule.left, candidates.popleft())
+                if new_rule.right and new_rule not in seen:
+                    seen.add(new_rule)
+                    new_rules.append(new_rule)
+                    for idx, sym in enumerate(new_rule.right):
+                        if sym in nullable:
+                            candidates.append(
+                                new_rule.right[:idx] + new_rule.right[idx + 1 :]
+                            )
 
-        visit(cfg.start)
+        if self.start in nullable:
+            new_start = self.new_nonterminal(self.start.symbol)
+            new_rules.append(Rule(new_start, [self.start]))
+            new_rules.append(Rule(new_start, []))
+            self.start = new_start
 
-        return reachable
+        self.rules = new_rules
+        return self
 
-    @staticmethod
-    def remove_useless_rules(cfg):
-        useful_nonterminals = CFGrammar.get_generating_nonterminals(
-            cfg
-        ) & CFGrammar.get_reachable_nonterminals(cfg)
-        new_rules = []
+    def update_start(self):
+        if any(self.start in rule.right for rule in self.rules):
+            new_start = self.new_nonterminal(self.start.symbol)
+            self.rules.append(Rule(new_start, [self.start]))
+            self.start = new_start
+        return self
 
-        for rule in cfg.rules:
-            if rule.left in useful_nonterminals:
-                new_rules.append(Rule(rule.left, rule.right))
+    def remove_unit_rules(self):
+        unit_targets = defaultdict(list)
+        non_unit_rules = defaultdict(list)
 
-        return CFGrammar(cfg.start, new_rules)
+        for rule in self.rules:
+            if len(rule.right) == 1 and isinstance(rule.right[0], Nonterminal):
+                unit_targets[rule.left].append(rule.right[0])
+            else:
+                non_unit_rules[rule.left].append(rule)
 
-    @staticmethod
-    def remove_terminal_rules(cfg):
         new_rules = []
-        used_nonterminals = set()
+        seen = set()
+
+        for left in list(non_unit_rules) + list(unit_targets):
+            if left in seen:
+                continue
+            seen.add(left)
+            # Unit closure of `left`: every B with left =>* B by unit rules,
+            # in the order found, so that the rules do not depend on the
+            # hashes of the nonterminals.
+            closure = [left]
+            in_closure = {left}
+            for nonterminal in closure:
+                for target in unit_targets[nonterminal]:
+                    if target not in in_closure:
+                        in_closure.add(target)
+                        closure.append(target)
+            added = set()
+            for nonterminal in closure:
+                for rule in non_unit_rules[nonterminal]:
+                    if rule.right not in added:
+                        added.add(rule.right)
+                        new_rules.append(Rule(left, rule.right))
+
+        self.rules = new_rules
+        return self
+
+    def remove_useless_rules(self):
+        generating = self.get_generating_nonterminals()
+        self.rules = [
+            rule
+            for rule in self.rules
+            if rule.left in generating
+            and all(
+                sym in generating for sym in rule.right if isinstance(sym, Nonterminal)
+            )
+        ]
+        reachable = self.get_reachable_nonterminals()
+        self.rules = [rule for rule in self.rules if rule.left in reachable]
+        return self
+
+    def remove_terminal_rules(self):
+        new_rules = []
+        terminal_nonterminals = {}
 
-        for rule in cfg.rules:
+        def to_nonterminal(sym):
+            if isinstance(sym, Nonterminal):
+                return sym
+            if sym not in terminal_nonterminals:
+                terminal_nonterminals[sym] = self.new_nonterminal(sym.symbol)
+                new_rules.append(Rule(terminal_nonterminals[sym], [sym]))
+            return terminal_nonterminals[sym]
+
+        for rule in self.rules:
             if len(rule.right) == 2:
-                right1, right2 = rule.right[0], rule.right[1]
-                if right1 not in cfg.nonterminals:
-                    new_right1 = cfg.new_nonterminal(right1.symbol, used_nonterminals)
-                    used_nonterminals.add(new_right1)
-                    new_rules.append(Rule(new_right1, [right1]))
-                    right1 = new_right1
-                if right2 not in cfg.nonterminals:
-                    new_right2 = cfg.new_nonterminal(right2.symbol, used_nonterminals)
-                    used_nonterminals.add(new_right2)
-                    new_rules.append(Rule(new_right2, [right2]))
-                    right2 = new_right2
-                new_rules.append(Rule(rule.left, [right1, right2]))
+                new_rules.append(Rule(rule.left, map(to_nonterminal, rule.right)))
             else:
-                new_rules.append(Rule(rule.left, rule.right))
+                new_rules.append(rule)
 
-        return CFGrammar(cfg.start, new_rules)
-
-    @staticmethod
-    def to_chomsky_normal_form(cfg):
-        new_cfg = CFGrammar.remove_long_rules(cfg)
-        new_cfg = CFGrammar.remove_nullable_rules(new_cfg)
-        new_cfg = CFGrammar.update_start(new_cfg)
-        new_cfg = CFGrammar.remove_unit_rules(new_cfg)
-        new_cfg = CFGrammar.remove_useless_rules(new_cfg)
-        new_cfg = CFGrammar.remove_terminal_rules(new_cfg)
-
-        return new_cfg
+        self.rules = new_rules
+        return self
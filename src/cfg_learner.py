@@ -1,11 +1,25 @@
 from .cfg import Terminal, Nonterminal, CongruentClass, Rule, CFGrammar
+from .class_products import ClassProducts
 from .cky_parser import CKYParser
-from .graph import Graph
+from .congruence_index import CongruenceIndex
+from .context_index import ContextIndex
+from .disjoint_set import DisjointSet
+from .learning_budget import (
+    BudgetExceeded,
+    LearningBudget,
+    LearningResult,
+    LearningState,
+)
+from .learning_metrics import LearningMetrics
+from .membership_cache import MembershipCache
+from .prime_decomposition import PrimeDecomposition
 from .utils import to_iterable
 
-import time
-from collections import defaultdict
-from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, product
+import os
+import pickle
+import tempfile
 
 
 class CFGLearner:
@@ -13,10 +27,40 @@ class CFGLearner:
     A class that learns Context-free grammar from a set of words
     using a strong learning algorithm for substitutable context-free languages
     by A. Clark.
+
+    With `n_jobs > 1` the class stages run in a pool of worker processes,
+    started on first use and kept for later runs; `close()` or a `with`
+    block shuts it down. Runs with fewer than `MIN_PARALLEL_CLASSES`
+    classes stay in the main process, where they are faster than the
+    round trips to the workers.
     """
 
-    def __init__(self):
-        ...
+    MIN_PARALLEL_CLASSES = 64
+
+    def __init__(self, cache: MembershipCache | None = None, n_jobs: int | None = 1):
+        self.cache = cache if cache is not None else MembershipCache()
+        self.n_jobs = n_jobs if n_jobs is not None else os.cpu_count()
+        self._pool = None
+        self._pool_dir = None
+        self._pool_runs = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool_dir.cleanup()
+            self._pool = self._pool_dir = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.n_jobs)
+            self._pool_dir = tempfile.TemporaryDirectory(prefix="cfg_learner_")
+        return self._pool
 
     def _get_substrings(self, words: str | list[str] | set[str]) -> set[str]:
         return {
@@ -45,8 +89,17 @@ class CFGLearner:
             for j in range(i + 1, len(word) + 1)
         }
 
-    def weak_learn(self, words: list[str]) -> CFGrammar:
-        substrings = self._get_substrings(words)
+    def weak_learn(
+        self,
+        words: list[str],
+        index: ContextIndex | None = None,
+        budget: LearningBudget | None = None,
+    ) -> CFGrammar:
+        if index is None:
+            index = ContextIndex(words)
+        if budget is None:
+            budget = LearningBudget()
+        substrings = index.substrings()
         nonterminals = {x: Nonterminal(f"[[{x}]]") for x in substrings}
         start_nonterminals = set(map(nonterminals.get, words))
 
@@ -56,27 +109,14 @@ class CFGLearner:
         ]
 
         branching_productions = [
-            Rule(nonterminals[x[0] + x[1]], list(map(nonterminals.get, x)))
-            for x in self._get_substring_pairs(substrings)
+            Rule(nonterminals[x], [nonterminals[x1], nonterminals[x2]])
+            for x, x1, x2 in budget.watch(index.splits())
         ]
 
-        context_triples = list(self._get_substrings_with_contexts(words))
-        substitutables = []
-        unary_productions = []
-
-        for i in range(len(context_triples) - 1):
-            for j in range(i + 1, len(context_triples)):
-                if (
-                    context_triples[i][0] == context_triples[j][0]
-                    and context_triples[i][-1] == context_triples[j][-1]
-                ):
-                    substitutables.append(
-                        (context_triples[i][1], context_triples[j][1])
-                    )
-
-        for sub in substitutables:
-            unary_productions.append(Rule(nonterminals[sub[0]], [nonterminals[sub[1]]]))
-            unary_productions.append(Rule(nonterminals[sub[1]], [nonterminals[sub[0]]]))
+        unary_productions = [
+            Rule(nonterminals[u], [nonterminals[v]])
+            for u, v in budget.watch(index.substitutable_pairs())
+        ]
 
         start_nonterminal = Nonterminal("S")
 
@@ -89,83 +129,254 @@ class CFGLearner:
 
         return CFGrammar(start_nonterminal, rules)
 
-    def _get_congruent_classes(
-        self, words: list[str], grammar: CFGrammar, restrict_time: bool = False
-    ) -> list[CongruentClass]:
-        classes = defaultdict(set)
-        cky_parser = CKYParser(grammar)
-
-        def add_congruent_class_if_exists(substring):
-            for l_cl, r_cl in classes.keys():
-                if cky_parser.accepts(l_cl + substring + r_cl):
-                    classes[(l_cl, r_cl)].add(substring)
-                    return True
-            return False
-
-        start = time.time()
-
-        for word in words:
-            for l, v, r in self._get_substrings_with_contexts(word):
-                if not add_congruent_class_if_exists(v):
-                    classes[(l, r)].add(v)
+    def _substitution_grammar(
+        self, words: list[str], index: ContextIndex, classes: DisjointSet
+    ) -> CFGrammar:
+        """
+        The weak grammar with the substrings of every substitution class
+        merged into one nonterminal. Its unit rules only link substrings
+        sharing a context, so their closure is exactly a substitution class
+        and the merged grammar has the same language with far fewer
+        nonterminals and no unit rules to eliminate.
+        """
+        nonterminals = {}
+        for rep, members in classes.groups():
+            nonterminal = Nonterminal(f"[[{rep}]]")
+            nonterminals.update(dict.fromkeys(members, nonterminal))
 
-                if restrict_time and time.time() - start > 10:
-                    return []
+        start = Nonterminal("S")
+        rules = {Rule(start, [nonterminals[word]]) for word in words}
+        rules.update(
+            Rule(nonterminals[a], [Terminal(a)]) for a in nonterminals if len(a) == 1
+        )
+        rules.update(
+            Rule(nonterminals[x], [nonterminals[x1], nonterminals[x2]])
+            for x, x1, x2 in index.splits()
+        )
+        return CFGrammar(start, list(rules))
 
-        return list(map(CongruentClass, classes.values()))
+    def _get_congruent_classes(
+        self,
+        words: list[str],
+        grammar: CFGrammar,
+        restrict_time: bool = False,
+        index: ContextIndex | None = None,
+        metrics: LearningMetrics | None = None,
+        budget: LearningBudget | None = None,
+        congruence: CongruenceIndex | None = None,
+    ) -> list[CongruentClass]:
+        if restrict_time and budget is None:
+            try:
+                return self._get_congruent_classes(
+                    words, grammar, False, index, metrics, LearningBudget(10).start()
+                )
+            except BudgetExceeded:
+                return []
+
+        if index is None:
+            index = ContextIndex(words)
+        if budget is None:
+            budget = LearningBudget()
+        if congruence is None:
+            parser = CKYParser(grammar, self.cache)
+            congruence = CongruenceIndex(parser, index.substitution_classes())
+        parser = congruence.parser
+        # Substrings already placed are skipped in O(1) by `add`, so a
+        # congruence index that was interrupted goes on where it stopped.
+        parses = budget.used_parses - parser.parses
+
+        try:
+            for word in words:
+                for l, v, r in index.triples(word):
+                    congruence.add(l, v, r)
+                    budget.used_parses = parses + parser.parses
+                    budget.check()
+        finally:
+            if metrics is not None:
+                metrics.count("parses", parser.parses)
+
+        congruence.release()
+        return congruence.classes()
 
     def _test_class_primality(
-        self, hclass: CongruentClass, classes: list[CongruentClass]
+        self,
+        hclass: CongruentClass,
+        classes: list[CongruentClass],
+        products: ClassProducts | None = None,
     ) -> bool:
-        words_classes = {word: cls.words for cls in classes for word in cls.words}
+        if products is None:
+            products = ClassProducts()
+        words_classes = {word: cls for cls in classes for word in cls.words}
 
         for u, v in self._get_substring_pairs(hclass.rep):
-            if hclass.words.issubset(
-                {
-                    "".join(words)
-                    for words in product(words_classes[u], words_classes[v])
-                }
-            ):
+            if products.covers(hclass, [words_classes[u], words_classes[v]]):
                 return False
         return True
 
     def _get_prime_decomposition(
-        self, cls: CongruentClass, prime_classes: list[CongruentClass]
+        self,
+        cls: CongruentClass,
+        prime_classes: list[CongruentClass],
+        decomposition: PrimeDecomposition | None = None,
     ) -> list[CongruentClass]:
         if cls in prime_classes:
             return [cls]
 
-        words_prime_classes = {word: cls for cls in prime_classes for word in cls.words}
-        graph = Graph()
-
-        for i in range(len(cls.rep)):
-            for j in range(i + 1, len(cls.rep) + 1):
-                if cls.rep[i:j] in words_prime_classes:
-                    graph.add_edge(i, j, 1)
-
-        shortest_path = graph.shortest_path(0, len(graph.vertices) - 1)
-
+        if decomposition is None:
+            decomposition = PrimeDecomposition(prime_classes)
+        return decomposition.decompose(cls.rep)
+
+    def _prime_ids(
+        self,
+        classes: list[CongruentClass],
+        ids,
+        products: ClassProducts,
+        budget: LearningBudget | None = None,
+    ) -> list[int]:
+        if budget is None:
+            budget = LearningBudget()
         return [
-            words_prime_classes[cls.rep[shortest_path[i] : shortest_path[i + 1]]]
-            for i in range(len(shortest_path) - 1)
+            i
+            for i in budget.watch(ids)
+            if self._test_class_primality(classes[i], classes, products)
         ]
 
-    def strong_learn(
-        self, words: list[str], restrict_time: bool = False
-    ) -> CFGrammar | None:
-        weak_cfg = self.weak_learn(words)
-        classes = self._get_congruent_classes(words, weak_cfg, restrict_time)
-
-        if restrict_time and not classes:
-            return None
-
-        prime_classes = list(
-            filter(lambda x: self._test_class_primality(x, classes), classes)
-        )
+    def _decompose_ids(
+        self,
+        classes: list[CongruentClass],
+        ids,
+        decomposition: PrimeDecomposition,
+        budget: LearningBudget | None = None,
+    ) -> list[tuple[int, ...]]:
+        if budget is None:
+            budget = LearningBudget()
+        class_ids = {cls.rep: i for i, cls in enumerate(classes)}
+        return [
+            tuple(class_ids[cls.rep] for cls in decomposition.decompose(classes[i].rep))
+            for i in budget.watch(ids)
+        ]
 
+    def _branching_ids(
+        self,
+        classes: list[CongruentClass],
+        prime_ids: list[int],
+        decompositions: list[tuple[int, ...]],
+        left_ids,
+        products: ClassProducts,
+        budget: LearningBudget | None = None,
+    ) -> list[tuple[int, int, int]]:
+        if budget is None:
+            budget = LearningBudget()
+        prime_strings = {word for i in prime_ids for word in classes[i].words}
+        branching = []
+
+        for n, m, q in budget.watch(product(left_ids, prime_ids, range(len(classes)))):
+            N, M = classes[n], classes[m]
+            Q_primes = [classes[i] for i in decompositions[q]]
+
+            if products.intersects(N, [M] + Q_primes) and all(
+                M.rep + "".join([cls.rep for cls in Q_primes[:i]]) not in prime_strings
+                for i in range(1, len(Q_primes))
+            ):
+                branching.append((n, m, q))
+
+        return branching
+
+    def _class_stages(
+        self, state: LearningState, metrics: LearningMetrics, budget: LearningBudget
+    ):
+        classes = state.classes
+        ids = list(range(len(classes)))
+        path = None
+
+        if self.n_jobs > 1 and len(classes) >= self.MIN_PARALLEL_CLASSES:
+            # Classes are written once per run, as tuples of words starting
+            # with the representative, and every worker loads them on its
+            # first chunk of the run; work units are chunks of class ids,
+            # and the budget is checked as chunks come back.
+            pool = self._get_pool()
+            self._pool_runs += 1
+            path = os.path.join(self._pool_dir.name, f"{self._pool_runs}.pickle")
+            with open(path, "wb") as file:
+                pickle.dump([(cls.rep, *cls.words) for cls in classes], file)
+
+            def run(stage, ids, *args):
+                size = max(1, -(-len(ids) // (4 * self.n_jobs)))
+                chunks = [ids[i : i + size] for i in range(0, len(ids), size)]
+                futures = [pool.submit(stage, path, *args, chunk) for chunk in chunks]
+                try:
+                    results = []
+                    for future in futures:
+                        results.extend(future.result())
+                        reason = budget.exhausted()
+                        if reason is not None:
+                            raise BudgetExceeded(reason)
+                    return results
+                finally:
+                    for future in futures:
+                        future.cancel()
+
+            def prime():
+                return run(_prime_chunk, ids)
+
+            def decompose():
+                return run(_decomposition_chunk, ids, state.prime_ids)
+
+            def branch():
+                return run(
+                    _branching_chunk,
+                    state.prime_ids,
+                    state.prime_ids,
+                    state.decompositions,
+                )
+
+        else:
+            products = ClassProducts()
+
+            def prime():
+                return self._prime_ids(classes, ids, products, budget)
+
+            def decompose():
+                primes = [classes[i] for i in state.prime_ids]
+                decomposition = PrimeDecomposition(primes)
+                return self._decompose_ids(classes, ids, decomposition, budget)
+
+            def branch():
+                return self._branching_ids(
+                    classes,
+                    state.prime_ids,
+                    state.decompositions,
+                    state.prime_ids,
+                    products,
+                    budget,
+                )
+
+        try:
+            for stage, attribute, fn in (
+                ("primality", "prime_ids", prime),
+                ("decomposition", "decompositions", decompose),
+                ("branching", "branching", branch),
+            ):
+                if getattr(state, attribute) is None:
+                    state.stage = stage
+                    with metrics.stage(stage):
+                        setattr(state, attribute, fn())
+        finally:
+            if path is not None:
+                os.remove(path)
+
+    def _build_grammar(
+        self,
+        words: list[str],
+        classes: list[CongruentClass],
+        prime_ids: list[int],
+        decompositions: list[tuple[int, ...]],
+        branching: list[tuple[int, int, int]],
+    ) -> CFGrammar:
+        prime_classes = [classes[i] for i in prime_ids]
         prime_decompositions = {
-            cls.rep: self._get_prime_decomposition(cls, prime_classes)
-            for cls in classes
+            cls.rep: [classes[i] for i in decomposition]
+            for cls, decomposition in zip(classes, decompositions)
         }
 
         nonterminals = {cls.rep: Nonterminal(f"[[{cls.rep}]]") for cls in prime_classes}
@@ -185,24 +396,192 @@ class CFGLearner:
             for word in set(words) & set(prime_decompositions.keys())
         ]
 
-        branching_productions = []
-        prime_strings = set(sum([list(cls.words) for cls in prime_classes], []))
-
-        for N, M, Q in product(prime_classes, prime_classes, classes):
-            Q_primes = prime_decompositions[Q.rep]
-            production = Rule(
-                nonterminals[N.rep],
-                [nonterminals[M.rep]] + [nonterminals[cls.rep] for cls in Q_primes],
+        branching_productions = [
+            Rule(
+                nonterminals[classes[n].rep],
+                [nonterminals[classes[m].rep]]
+                + [nonterminals[classes[i].rep] for i in decompositions[q]],
             )
-
-            if set(
-                "".join(x) for x in product(M.words, *[cls.words for cls in Q_primes])
-            ) & N.words and all(
-                M.rep + "".join([cls.rep for cls in Q_primes[:i]]) not in prime_strings
-                for i in range(1, len(Q_primes))
-            ):
-                branching_productions.append(production)
+            for n, m, q in branching
+        ]
 
         return CFGrammar(
             start, init_productions + lexical_productions + branching_productions
         )
+
+    def strong_learn(
+        self,
+        words: list[str],
+        restrict_time: bool = False,
+        metrics: LearningMetrics | None = None,
+        budget: LearningBudget | None = None,
+        state: LearningState | None = None,
+    ) -> CFGrammar | None:
+        """
+        Learn a grammar from `words`. With a `budget`, learning raises
+        BudgetExceeded once a limit is exceeded; the exception carries the
+        state learned so far, and passing it back as `state` resumes the
+        run. `restrict_time` is a 10 second budget after which None is
+        returned.
+        """
+        if restrict_time and budget is None:
+            try:
+                budget = LearningBudget(seconds=10)
+                return self.strong_learn(words, False, metrics, budget, state)
+            except BudgetExceeded:
+                return None
+
+        if metrics is None:
+            metrics = LearningMetrics()
+        if budget is None:
+            budget = LearningBudget()
+        if state is None:
+            state = LearningState(words)
+        elif state.words != list(words):
+            raise ValueError("the learning state belongs to another sample")
+        budget.start()
+        cache_stats = self.cache.stats()
+
+        try:
+            return self._strong_learn(state, metrics, budget)
+        except BudgetExceeded as exc:
+            exc.state = state
+            raise
+        finally:
+            metrics.cache = {
+                name: (
+                    value - cache_stats[name]
+                    if name in ("hits", "misses", "evictions")
+                    else value
+                )
+                for name, value in self.cache.stats().items()
+            }
+
+    def learn_within(
+        self,
+        words: list[str],
+        budget: LearningBudget,
+        state: LearningState | None = None,
+        metrics: LearningMetrics | None = None,
+    ) -> LearningResult:
+        """
+        Learn a grammar within `budget`. If the budget runs out, the result
+        holds the best grammar learned so far, is not `complete`, and its
+        `state` can be passed back to resume.
+        """
+        if state is None:
+            state = LearningState(words)
+        try:
+            grammar = self.strong_learn(words, False, metrics, budget, state)
+        except BudgetExceeded as exc:
+            return LearningResult(state.partial_grammar(), False, state, exc.reason)
+        return LearningResult(grammar, True, state)
+
+    def learn_with_metrics(
+        self,
+        words: list[str],
+        restrict_time: bool = False,
+        callbacks=(),
+        profile_dir: str | None = None,
+    ) -> tuple[CFGrammar | None, LearningMetrics]:
+        """
+        Learn a grammar with `strong_learn` and return it together with the
+        time of every stage, the sizes of the intermediate results and the
+        use of the membership cache during the run.
+        """
+        metrics = LearningMetrics(callbacks, profile_dir)
+        return self.strong_learn(words, restrict_time, metrics), metrics
+
+    def _strong_learn(
+        self, state: LearningState, metrics: LearningMetrics, budget: LearningBudget
+    ) -> CFGrammar:
+        if state.grammar is not None:
+            return state.grammar
+        words = state.words
+
+        if state.weak_cfg is None:
+            state.stage = "weak_learn"
+            with metrics.stage("weak_learn"):
+                index = ContextIndex()
+                for word in budget.watch(words):
+                    index.add(word)
+                state.weak_cfg = self.weak_learn(words, index, budget)
+                state.index = index
+        metrics.count("substrings", len(state.index.contexts_by_substring))
+        metrics.count("triples", len(state.index))
+        metrics.count("weak_rules", len(state.weak_cfg.rules))
+
+        if state.classes is None:
+            state.stage = "congruent_classes"
+            if state.congruence is None:
+                state.congruence = CongruenceIndex(
+                    CKYParser(state.weak_cfg, self.cache),
+                    state.index.substitution_classes(),
+                )
+            with metrics.stage("congruent_classes"):
+                state.classes = self._get_congruent_classes(
+                    words,
+                    state.weak_cfg,
+                    False,
+                    state.index,
+                    metrics,
+                    budget,
+                    state.congruence,
+                )
+        metrics.count("classes", len(state.classes))
+
+        self._class_stages(state, metrics, budget)
+        metrics.count("prime_classes", len(state.prime_ids))
+
+        state.stage = "rules"
+        with metrics.stage("rules"):
+            grammar = self._build_grammar(
+                words,
+                state.classes,
+                state.prime_ids,
+                state.decompositions,
+                state.branching,
+            )
+        state.grammar = grammar
+        state.stage = "done"
+        metrics.count("rules", len(grammar.rules))
+        return grammar
+
+
+# State of a worker process of CFGLearner(n_jobs > 1), set up again for every
+# learning run, i.e. for every file of classes.
+_worker = {}
+
+
+def _load_classes(path):
+    if _worker.get("path") != path:
+        with open(path, "rb") as file:
+            compact_classes = pickle.load(file)
+        _worker.clear()
+        _worker["path"] = path
+        _worker["learner"] = CFGLearner()
+        _worker["classes"] = [
+            CongruentClass(words, words[0]) for words in compact_classes
+        ]
+        _worker["products"] = ClassProducts()
+    return _worker["learner"], _worker["classes"]
+
+
+def _prime_chunk(path, ids):
+    learner, classes = _load_classes(path)
+    return learner._prime_ids(classes, ids, _worker["products"])
+
+
+def _decomposition_chunk(path, prime_ids, ids):
+    learner, classes = _load_classes(path)
+    if _worker.get("prime_ids") != prime_ids:
+        _worker["prime_ids"] = prime_ids
+        _worker["decomposition"] = PrimeDecomposition([classes[i] for i in prime_ids])
+    return learner._decompose_ids(classes, ids, _worker["decomposition"])
+
+
+def _branching_chunk(path, prime_ids, decompositions, left_ids):
+    learner, classes = _load_classes(path)
+    return learner._branching_ids(
+        classes, prime_ids, decompositions, left_ids, _worker["products"]
+    )
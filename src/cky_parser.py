@@ -1,34 +1,268 @@
-from .cfg import Terminal, CFGrammar
+from .cfg import CFGrammar
+from .compiled_grammar import CompiledGrammar
+from .earley_parser import EarleyParser
+from .incremental_cky import IncrementalCKY, context_accepts
+from .matrix_parser import MatrixParser
+from .membership_cache import MembershipCache
+from .parse_forest import ParseForest
+
+from collections import defaultdict
+
+import numpy as np
 
 
 class CKYParser:
-    def __init__(self, grammar: CFGrammar):
+    """
+    CKY recognizer over the CNF of a grammar. `accepted` is an optional set
+    of words known to be in the language, e.g. words accepted by a grammar
+    whose rules are a subset of this one's; they are answered without
+    parsing, and words this parser accepts are added to it.
+
+    With `backend="earley"`, `accepts` and `accepts_many` run the Earley
+    recognizer on the grammar itself instead, which skips the CNF
+    conversion and is faster on long words of unambiguous grammars. With
+    the CKY backend, `matrix_length` opts in to parsing words of at least
+    that many symbols by boolean matrix multiplication instead of the span
+    loop, as long as their chart fits in `MatrixParser.max_cells`; its
+    memory is quadratic in the word length, so this is off by default.
+    """
+
+    BACKENDS = ("cky", "earley")
+
+    def __init__(
+        self,
+        grammar: CFGrammar,
+        cache: MembershipCache | None = None,
+        accepted: set[str] | None = None,
+        backend: str = "cky",
+        matrix_length: int | None = None,
+    ):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown parser backend: {backend}")
         self.grammar = grammar
+        self.cache = cache
+        self.accepted = accepted
+        self.backend = backend
+        self.matrix_length = matrix_length
+        self.parses = 0
+        self._compiled = None
+        self._earley = None
+        self._matrix = None
+
+    @property
+    def compiled(self) -> CompiledGrammar:
+        if self._compiled is None or self._compiled.is_stale(self.grammar):
+            self._compiled = CompiledGrammar(self.grammar)
+        return self._compiled
+
+    @property
+    def earley(self) -> EarleyParser:
+        if self._earley is None or self._earley.grammar is not self.grammar:
+            self._earley = EarleyParser(self.grammar)
+        return self._earley
+
+    @property
+    def matrix(self) -> MatrixParser:
+        if self._matrix is None or self._matrix.grammar is not self.compiled:
+            self._matrix = MatrixParser(self.compiled)
+        return self._matrix
+
+    def _is_long(self, word: str) -> bool:
+        return (
+            self.matrix_length is not None
+            and len(word) >= self.matrix_length
+            and self.matrix.fits(len(word))
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        if self.backend == "earley":
+            return self.earley.tables.fingerprint
+        return self.compiled.fingerprint
+
+    def lookup(self, word: str) -> bool | None:
+        if self.accepted is not None and word in self.accepted:
+            return True
+        if self.cache is None:
+            return None
+        return self.cache.get(self.fingerprint, word)
+
+    def remember(self, word: str, accepted: bool):
+        # Every word that is actually parsed is remembered once.
+        self.parses += 1
+        if accepted and self.accepted is not None:
+            self.accepted.add(word)
+        if self.cache is not None:
+            self.cache.put(self.fingerprint, word, accepted)
 
     def accepts(self, word: str) -> bool:
-        grammar = CFGrammar.to_chomsky_normal_form(self.grammar)
-        nonterminals = [grammar.start] + list(grammar.nonterminals - {grammar.start})
-        table = [
-            [[False for _ in range(len(nonterminals))] for _ in range(len(word))]
-            for _ in range(len(word))
-        ]
-
-        for char_idx, char in enumerate(word):
-            for rule in grammar.rules:
-                if len(rule.right) == 1 and rule.right[0] == Terminal(char):
-                    table[0][char_idx][nonterminals.index(rule.left)] = True
-
-        for l in range(1, len(word)):
-            for s in range(len(word) - l):
+        accepted = self.lookup(word)
+        if accepted is None:
+            accepted = self._accepts(word)
+            self.remember(word, accepted)
+        return accepted
+
+    def _accepts(self, word: str) -> bool:
+        if self.backend == "earley":
+            return self.earley.accepts(word)
+        if self._is_long(word):
+            return self.matrix.accepts(word)
+
+        grammar = self.compiled
+
+        if not word:
+            return grammar.accepts_empty
+
+        terminal_masks = grammar.terminal_masks
+        chart = [[terminal_masks.get(char, 0) for char in word]]
+        if not all(chart[0]):
+            return False
+
+        combine = grammar.combine
+        start_mask = grammar.start_mask
+        n = len(word)
+
+        for l in range(1, n):
+            row = []
+            for s in range(n - l):
+                cell = 0
                 for p in range(l):
-                    for rule in grammar.rules:
-                        if len(rule.right) == 2:
-                            if (
-                                table[p][s][nonterminals.index(rule.right[0])]
-                                and table[l - p - 1][s + p + 1][
-                                    nonterminals.index(rule.right[1])
-                                ]
-                            ):
-                                table[l][s][nonterminals.index(rule.left)] = True
-
-        return table[len(word) - 1][0][0]
+                    left = chart[p][s]
+                    right = chart[l - p - 1][s + p + 1]
+                    if left and right:
+                        cell |= combine(left, right)
+                        if l == n - 1 and cell & start_mask:
+                            return True
+                row.append(cell)
+            chart.append(row)
+
+        return bool(chart[n - 1][0] & start_mask)
+
+    def span_cell(self, word: str, spans: dict[str, int]) -> int:
+        """
+        Bitmask of the nonterminals deriving `word`. The cell of a span
+        depends only on its text, so cells are kept in `spans` and shared
+        by every word parsed with the same table.
+        """
+        if word in spans:
+            return spans[word]
+
+        grammar = self.compiled
+        combine = grammar.combine
+        n = len(word)
+
+        for l in range(1, n + 1):
+            for s in range(n - l + 1):
+                span = word[s : s + l]
+                if span in spans:
+                    continue
+                if l == 1:
+                    spans[span] = grammar.terminal_masks.get(span, 0)
+                    continue
+                cell = 0
+                for p in range(1, l):
+                    left = spans[span[:p]]
+                    right = spans[span[p:]]
+                    if left and right:
+                        cell |= combine(left, right)
+                spans[span] = cell
+
+        return spans[word]
+
+    def first_accepted(self, words: list[str], spans: dict[str, int]) -> int | None:
+        """
+        Index of the first word accepted by the grammar, or None. The words
+        are parsed in order with span cells shared through `spans`.
+        """
+        start_mask = self.compiled.start_mask
+        for idx, word in enumerate(words):
+            accepted = self.lookup(word)
+            if accepted is None:
+                if word:
+                    accepted = bool(self.span_cell(word, spans) & start_mask)
+                else:
+                    accepted = self.compiled.accepts_empty
+                self.remember(word, accepted)
+            if accepted:
+                return idx
+        return None
+
+    def parse_forest(self, word: str) -> ParseForest:
+        """
+        Packed forest of all derivations of `word` from the rules of the
+        grammar, which are not converted to CNF.
+        """
+        return ParseForest(self.grammar, word)
+
+    def incremental(self, prefix: str = "") -> IncrementalCKY:
+        return IncrementalCKY(self.compiled).extend(prefix)
+
+    def accepts_in_context(
+        self, left: str, right: str, substrings: list[str]
+    ) -> list[bool]:
+        results = [self.lookup(left + v + right) for v in substrings]
+        pending = [idx for idx, accepted in enumerate(results) if accepted is None]
+
+        if pending:
+            computed = context_accepts(
+                self.incremental(left), right, [substrings[idx] for idx in pending]
+            )
+            for idx, accepted in zip(pending, computed):
+                results[idx] = accepted
+                self.remember(left + substrings[idx] + right, accepted)
+
+        return results
+
+    def accepts_many(self, words: list[str]) -> np.ndarray:
+        result = np.zeros(len(words), dtype=bool)
+        buckets = defaultdict(list)
+
+        for idx, word in enumerate(words):
+            accepted = self.lookup(word)
+            if accepted is None:
+                buckets[len(word)].append(idx)
+            else:
+                result[idx] = accepted
+
+        for length, indices in buckets.items():
+            if self.backend == "earley":
+                result[indices] = self.earley.accepts_many(
+                    [words[idx] for idx in indices]
+                )
+            elif length == 0:
+                result[indices] = self.compiled.accepts_empty
+            elif self._is_long(words[indices[0]]):
+                result[indices] = [self.matrix.accepts(words[idx]) for idx in indices]
+            else:
+                result[indices] = self._accepts_bucket(
+                    [words[idx] for idx in indices], length
+                )
+            for idx in indices:
+                self.remember(words[idx], bool(result[idx]))
+
+        return result
+
+    def _accepts_bucket(self, words: list[str], n: int) -> np.ndarray:
+        # chart[l] has shape (n - l, len(words), |N|): cell [s, w, A] is set
+        # if A derives the span of length l + 1 starting at s in words[w].
+        arrays = self.compiled.arrays
+        terminal_index = arrays["terminal_index"]
+        unknown = len(terminal_index)
+        left, right, parents = arrays["left"], arrays["right"], arrays["parents"]
+
+        codes = np.array(
+            [[terminal_index.get(char, unknown) for char in word] for word in words],
+            dtype=np.intp,
+        )
+        chart = [arrays["terminals"][codes.T]]
+
+        for l in range(1, n):
+            hits = np.zeros((n - l, len(words), len(left)), dtype=bool)
+            for p in range(l):
+                hits |= (
+                    chart[p][: n - l][..., left]
+                    & chart[l - p - 1][p + 1 : p + 1 + n - l][..., right]
+                )
+            chart.append(hits @ parents)
+
+        return chart[n - 1][0][:, self.compiled.start_id]
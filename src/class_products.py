@@ -0,0 +1,106 @@
+from .cfg import CongruentClass
+
+from collections import defaultdict
+
+
+class ClassProducts:
+    """
+    Membership tests for concatenations of congruence classes. A word is
+    checked against a sequence of classes by walking the positions it can
+    be split at, trying only the word lengths that occur in each class and
+    fit into what is left of the word, and looking the parts up in the
+    class's word set. No concatenation of classes is ever built, and a
+    search over a set of words stops at the first word that matches.
+
+    With `memo`, the answers of `intersects` and `covers` are kept by the
+    contents of the classes, so they stay valid when the same instance is
+    used for a partition that shares only some classes.
+    """
+
+    def __init__(self, memo: bool = False):
+        self._lengths = {}
+        self._by_length = {}
+        self._memo = {} if memo else None
+
+    def lengths(self, cls: CongruentClass) -> list[int]:
+        if cls.words not in self._lengths:
+            self._lengths[cls.words] = sorted(set(map(len, cls.words)))
+        return self._lengths[cls.words]
+
+    def by_length(self, cls: CongruentClass) -> dict[int, list[str]]:
+        if cls.words not in self._by_length:
+            words = defaultdict(list)
+            for word in cls.words:
+                words[len(word)].append(word)
+            self._by_length[cls.words] = words
+        return self._by_length[cls.words]
+
+    def _bounds(self, parts):
+        # Shortest and longest total length of the parts from each position.
+        lo, hi = [0], [0]
+        for cls in reversed(parts):
+            lengths = self.lengths(cls)
+            lo.append(lo[-1] + lengths[0])
+            hi.append(hi[-1] + lengths[-1])
+        return lo[::-1], hi[::-1]
+
+    def splits(self, word: str, parts: list[CongruentClass], bounds=None) -> bool:
+        """
+        Whether `word` is in the concatenation of the classes `parts`.
+        """
+        lo, hi = bounds or self._bounds(parts)
+        if not lo[0] <= len(word) <= hi[0]:
+            return False
+
+        positions = {0}
+        for idx, cls in enumerate(parts):
+            next_positions = set()
+            for pos in positions:
+                rest = len(word) - pos
+                for length in self.lengths(cls):
+                    if length > rest - lo[idx + 1]:
+                        break
+                    if (
+                        length >= rest - hi[idx + 1]
+                        and word[pos : pos + length] in cls.words
+                    ):
+                        next_positions.add(pos + length)
+            if not next_positions:
+                return False
+            positions = next_positions
+
+        return len(word) in positions
+
+    def _memoized(self, test, cls, parts):
+        if self._memo is None:
+            return test(cls, parts)
+        key = (test.__name__, cls.words, *(part.words for part in parts))
+        if key not in self._memo:
+            self._memo[key] = test(cls, parts)
+        return self._memo[key]
+
+    def intersects(self, cls: CongruentClass, parts: list[CongruentClass]) -> bool:
+        """
+        Whether some word of `cls` is in the concatenation of `parts`.
+        """
+        return self._memoized(self._intersects, cls, parts)
+
+    def covers(self, cls: CongruentClass, parts: list[CongruentClass]) -> bool:
+        """
+        Whether every word of `cls` is in the concatenation of `parts`.
+        """
+        return self._memoized(self._covers, cls, parts)
+
+    def _intersects(self, cls, parts):
+        bounds = self._bounds(parts)
+        lo, hi = bounds[0][0], bounds[1][0]
+        return any(
+            self.splits(word, parts, bounds)
+            for length, words in self.by_length(cls).items()
+            if lo <= length <= hi
+            for word in words
+        )
+
+    def _covers(self, cls, parts):
+        bounds = self._bounds(parts)
+        return all(self.splits(word, parts, bounds) for word in cls.words)
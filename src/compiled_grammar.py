@@ -0,0 +1,124 @@
+from .cfg import CFGrammar
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class CompiledGrammar:
+    """
+    Chomsky normal form of a grammar together with the lookup tables
+    used by the CKY parser. Nonterminals are numbered so that the start
+    symbol always gets id 0, and a set of nonterminals is encoded as an
+    integer bitmask with bit `1 << id` set for every member.
+    """
+
+    def __init__(self, grammar: CFGrammar):
+        self.source = grammar
+        self.source_start = grammar.start
+        self.source_rules = list(grammar.rules)
+
+        self.fingerprint = grammar.fingerprint()
+        self.cnf = CFGrammar.to_chomsky_normal_form(grammar)
+        self.nonterminals = [self.cnf.start] + list(
+            self.cnf.nonterminals - {self.cnf.start}
+        )
+        self.ids = {nt: idx for idx, nt in enumerate(self.nonterminals)}
+        self.start_id = 0
+        self.accepts_empty = False
+
+        self.terminal_rules = defaultdict(list)
+        self.binary_rules = defaultdict(list)
+
+        for rule in self.cnf.rules:
+            left = self.ids[rule.left]
+            if len(rule.right) == 2:
+                self.binary_rules[
+                    (self.ids[rule.right[0]], self.ids[rule.right[1]])
+                ].append(left)
+            elif len(rule.right) == 1:
+                self.terminal_rules[rule.right[0].symbol].append(left)
+            elif left == self.start_id:
+                self.accepts_empty = True
+
+        self.start_mask = 1 << self.start_id
+        self.terminal_masks = {
+            terminal: self._to_mask(lefts)
+            for terminal, lefts in self.terminal_rules.items()
+        }
+        self.pair_masks = {
+            (1 << right1, 1 << right2): self._to_mask(lefts)
+            for (right1, right2), lefts in self.binary_rules.items()
+        }
+
+        self.binary_left_mask = 0
+        self.binary_by_left = defaultdict(lambda: [0, []])
+        for (left_bit, right_bit), parent_mask in self.pair_masks.items():
+            self.binary_left_mask |= left_bit
+            self.binary_by_left[left_bit][0] |= right_bit
+            self.binary_by_left[left_bit][1].append((right_bit, parent_mask))
+        self.binary_by_left = dict(self.binary_by_left)
+        self._arrays = None
+
+    @staticmethod
+    def _to_mask(ids):
+        mask = 0
+        for idx in ids:
+            mask |= 1 << idx
+        return mask
+
+    def combine(self, left_cell: int, right_cell: int) -> int:
+        parents = 0
+        left_cell &= self.binary_left_mask
+
+        while left_cell:
+            left_bit = left_cell & -left_cell
+            left_cell ^= left_bit
+            right_any, pairs = self.binary_by_left[left_bit]
+            if right_cell & right_any:
+                for right_bit, parent_mask in pairs:
+                    if right_cell & right_bit:
+                        parents |= parent_mask
+
+        return parents
+
+    @property
+    def arrays(self) -> dict:
+        """
+        Boolean matrices for the vectorized parser, built on first use:
+        `terminals` maps a terminal index to its row of nonterminals (the
+        last row is reserved for unknown characters), `left` and `right`
+        hold the child ids of every (B, C) pair and `parents` maps each
+        pair to the nonterminals deriving it.
+        """
+        if self._arrays is None:
+            terminal_index = {
+                terminal: idx for idx, terminal in enumerate(self.terminal_rules)
+            }
+            terminals = np.zeros(
+                (len(terminal_index) + 1, len(self.nonterminals)), dtype=bool
+            )
+            for terminal, lefts in self.terminal_rules.items():
+                terminals[terminal_index[terminal], lefts] = True
+
+            pairs = list(self.binary_rules.items())
+            parents = np.zeros((len(pairs), len(self.nonterminals)), dtype=bool)
+            for idx, (_, lefts) in enumerate(pairs):
+                parents[idx, lefts] = True
+
+            self._arrays = {
+                "terminal_index": terminal_index,
+                "terminals": terminals,
+                "left": np.array([pair[0] for pair, _ in pairs], dtype=np.intp),
+                "right": np.array([pair[1] for pair, _ in pairs], dtype=np.intp),
+                "parents": parents,
+            }
+        return self._arrays
+
+    def is_stale(self, grammar: CFGrammar) -> bool:
+        return (
+            grammar is not self.source
+            or grammar.start != self.source_start
+            or len(grammar.rules) != len(self.source_rules)
+            or grammar.rules != self.source_rules
+        )
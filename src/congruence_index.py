@@ -0,0 +1,77 @@
+from .cfg import CongruentClass
+from .cky_parser import CKYParser
+from .disjoint_set import DisjointSet
+
+
+class CongruenceIndex:
+    """
+    Partition of substrings into congruence classes, built one substring at
+    a time. Every class is represented by the context it was created with,
+    and a new substring joins the first class whose context it fits into,
+    or starts a class of its own. A substring is tested only once: the
+    class of each substring is kept in `class_of`, and the words
+    `l + substring + r` for all class contexts are parsed in one batch.
+
+    With `components`, substrings known to be congruent, e.g. the
+    substitution classes of a `ContextIndex`, are placed together: the
+    first substring of a component is tested and the rest of the component
+    follows it without parsing. Without a parser, every component is a
+    class of its own and nothing is parsed at all.
+
+    The span cells shared between the parses are kept in `spans`, which is
+    cleared before a substring once it holds more than `max_spans` entries,
+    and by `release` once no more substrings are added.
+    """
+
+    def __init__(
+        self,
+        parser: CKYParser | None = None,
+        components: DisjointSet | None = None,
+        max_spans: int = 2**18,
+    ):
+        self.parser = parser
+        self.components = components
+        self.max_spans = max_spans
+        self.contexts = []
+        self.members = []
+        self.reps = []
+        self.class_of = {}
+        self.spans = {}
+
+    def __len__(self) -> int:
+        return len(self.contexts)
+
+    def add(self, left: str, substring: str, right: str) -> int:
+        if substring in self.class_of:
+            return self.class_of[substring]
+
+        cls = None
+        if self.parser is not None:
+            if len(self.spans) > self.max_spans:
+                self.spans.clear()
+            cls = self.parser.first_accepted(
+                [l + substring + r for l, r in self.contexts], self.spans
+            )
+        if cls is None:
+            cls = len(self.contexts)
+            self.contexts.append((left, right))
+            self.members.append(set())
+            self.reps.append(substring)
+
+        if self.components is None:
+            component, rep = [substring], substring
+        else:
+            component = self.components.members(substring)
+            rep = self.components.representative(substring)
+
+        self.members[cls].update(component)
+        self.class_of.update(dict.fromkeys(component, cls))
+        if (len(rep), rep) < (len(self.reps[cls]), self.reps[cls]):
+            self.reps[cls] = rep
+        return cls
+
+    def release(self):
+        self.spans.clear()
+
+    def classes(self) -> list[CongruentClass]:
+        return list(map(CongruentClass, self.members, self.reps))
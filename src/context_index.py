@@ -0,0 +1,154 @@
+from .disjoint_set import DisjointSet
+from .substring_index import SubstringIndex
+from .utils import to_iterable
+
+from collections import defaultdict
+
+
+class ContextIndex:
+    """
+    Index of the (l, v, r) triples of a sample. Every substring `v` is
+    bucketed by the context `(l, r)` it occurs in, so that substitutable
+    substrings, i.e. substrings sharing a context, are found per bucket
+    instead of by comparing all pairs of triples.
+
+    Substrings and contexts are stored as the integer ids of a
+    `SubstringIndex`; each distinct substring, prefix and suffix is turned
+    into a string at most once, when it is first asked for.
+
+    Only the `SubstringIndex` is linear in the sample length. The two maps
+    keep one entry per distinct (context, substring) pair, and every span
+    of a word has its own context, so they hold up to the sum of |w|^2 / 2
+    entries: memory stays quadratic in the word lengths, like the triples.
+    """
+
+    CONTEXT_BITS = 32
+
+    def __init__(self, words: str | list[str] | set[str] | None = None):
+        self.index = SubstringIndex()
+        self.substrings_by_context = defaultdict(set)
+        self.contexts_by_substring = defaultdict(set)
+        self._texts = {}
+        self._prefixes = {}
+        self._suffixes = {}
+
+        for word in to_iterable(words or []):
+            self.add(word)
+
+    def __len__(self) -> int:
+        return sum(map(len, self.substrings_by_context.values()))
+
+    @property
+    def words(self) -> set[str]:
+        return set(self.index.words)
+
+    def add(self, word: str):
+        if word in self.index.word_ids:
+            return
+
+        word_id = self.index.add(word)
+        prefix_nodes = self.index.prefix_nodes[word_id]
+        suffix_nodes = self.index.suffix_nodes[word_id]
+
+        for i, j, substring_id in self.index.spans(word_id):
+            context = (prefix_nodes[i] << self.CONTEXT_BITS) | suffix_nodes[j]
+            self.substrings_by_context[context].add(substring_id)
+            self.contexts_by_substring[substring_id].add(context)
+
+    def text(self, substring_id: int) -> str:
+        if substring_id not in self._texts:
+            self._texts[substring_id] = self.index.text(substring_id)
+        return self._texts[substring_id]
+
+    def context_text(self, context: int) -> tuple[str, str]:
+        prefix_node = context >> self.CONTEXT_BITS
+        suffix_node = context & ((1 << self.CONTEXT_BITS) - 1)
+        if prefix_node not in self._prefixes:
+            self._prefixes[prefix_node] = self.index.prefix(prefix_node)
+        if suffix_node not in self._suffixes:
+            self._suffixes[suffix_node] = self.index.suffix(suffix_node)
+        return self._prefixes[prefix_node], self._suffixes[suffix_node]
+
+    def _find_context(self, context: tuple[str, str]) -> int | None:
+        left, right = context
+        prefix_node = suffix_node = 0
+        for char in left:
+            prefix_node = self.index.prefix_trie[prefix_node].get(char)
+            if prefix_node is None:
+                return None
+        for char in reversed(right):
+            suffix_node = self.index.suffix_trie[suffix_node].get(char)
+            if suffix_node is None:
+                return None
+        return (prefix_node << self.CONTEXT_BITS) | suffix_node
+
+    def substrings(self) -> set[str]:
+        return set(map(self.text, self.contexts_by_substring))
+
+    def contexts(self, substring: str | None = None) -> set[tuple[str, str]]:
+        if substring is None:
+            return set(map(self.context_text, self.substrings_by_context))
+        substring_id = self.index.find(substring)
+        return set(
+            map(self.context_text, self.contexts_by_substring.get(substring_id, ()))
+        )
+
+    def substitutable(self, context: tuple[str, str]) -> set[str]:
+        context_id = self._find_context(context)
+        return set(map(self.text, self.substrings_by_context.get(context_id, ())))
+
+    def substitutable_pairs(self):
+        """
+        Yield every ordered pair of distinct substrings sharing a context
+        once, as the buckets are walked.
+        """
+        seen = set()
+        for bucket in self.substrings_by_context.values():
+            if len(bucket) < 2:
+                continue
+            for u in bucket:
+                for v in bucket:
+                    if u != v and (u, v) not in seen:
+                        seen.add((u, v))
+                        yield self.text(u), self.text(v)
+
+    def substitution_classes(self) -> DisjointSet:
+        """
+        Classes of the closure of substitutability: substrings sharing a
+        context are merged, and the representative of a class is its
+        shortest, then lexicographically smallest substring.
+        """
+        classes = DisjointSet(
+            map(self.text, self.contexts_by_substring), key=lambda x: (len(x), x)
+        )
+        for bucket in self.substrings_by_context.values():
+            first, *rest = map(self.text, bucket)
+            for substring in rest:
+                classes.union(first, substring)
+        return classes
+
+    def triples(self, word: str):
+        """
+        Yield the `(l, v, r)` triples of a word, adding it to the index.
+        """
+        self.add(word)
+        word_id = self.index.word_ids[word]
+        prefix_nodes = self.index.prefix_nodes[word_id]
+        suffix_nodes = self.index.suffix_nodes[word_id]
+
+        for i, j, substring_id in self.index.spans(word_id):
+            left, right = self.context_text(
+                (prefix_nodes[i] << self.CONTEXT_BITS) | suffix_nodes[j]
+            )
+            yield left, self.text(substring_id), right
+
+    def splits(self):
+        """
+        Yield `(v, v1, v2)` for every distinct substring `v = v1 + v2` with
+        non-empty `v1` and `v2`.
+        """
+        for substring_id in self.contexts_by_substring:
+            if self.index.substring_length(substring_id) > 1:
+                substring = self.text(substring_id)
+                for left, right in self.index.splits(substring_id):
+                    yield substring, self.text(left), self.text(right)
@@ -0,0 +1,64 @@
+class DisjointSet:
+    """
+    Union-find over hashable items with path compression and union by
+    size. Every set keeps its members and its smallest member under `key`,
+    both updated on union, so neither has to be recomputed from the
+    members afterwards.
+    """
+
+    def __init__(self, items=(), key=None):
+        self.key = key if key is not None else (lambda x: x)
+        self.parent = {}
+        self._members = {}
+        self._rep = {}
+
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, item) -> bool:
+        return item in self.parent
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self._members[item] = [item]
+            self._rep[item] = item
+        return item
+
+    def find(self, item):
+        root = self.add(item)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, item1, item2):
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return root1
+        if len(self._members[root1]) < len(self._members[root2]):
+            root1, root2 = root2, root1
+
+        self.parent[root2] = root1
+        self._members[root1].extend(self._members.pop(root2))
+        rep = self._rep.pop(root2)
+        if self.key(rep) < self.key(self._rep[root1]):
+            self._rep[root1] = rep
+        return root1
+
+    def members(self, item) -> list:
+        return self._members[self.find(item)]
+
+    def representative(self, item):
+        return self._rep[self.find(item)]
+
+    def groups(self):
+        """
+        Yield `(representative, members)` for every set.
+        """
+        for root, members in self._members.items():
+            yield self._rep[root], members
@@ -0,0 +1,159 @@
+from .cfg import CFGrammar, Nonterminal
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class EarleyTables:
+    """
+    Tables of the Earley recognizer for a grammar as it is, without a
+    conversion to CNF. Every position of a dot in a rule, `A -> x . y`, is
+    numbered, and the dotted rules of a rule are numbered consecutively, so
+    moving the dot is adding one. An item is packed into the integer
+    `origin * size + dotted`. Prediction is filtered by one symbol of
+    lookahead: `predict[A][char]` lists the rules of A whose right side can
+    start with `char` or derive the empty word.
+    """
+
+    def __init__(self, grammar: CFGrammar):
+        self.source = grammar
+        self.source_start = grammar.start
+        self.source_rules = list(grammar.rules)
+        self.fingerprint = grammar.fingerprint()
+
+        nullable = CFGrammar.get_nullable_nonterminals(grammar)
+        first = grammar.first_follow(1)
+        nonterminals = [grammar.start] + list(
+            grammar.get_nonterminals() - {grammar.start}
+        )
+        ids = {nt: idx for idx, nt in enumerate(nonterminals)}
+
+        # For every dotted rule: the id of the nonterminal after the dot or
+        # -1, the terminal after the dot or None, and the id of the left side.
+        self.next_nonterminal = []
+        self.next_terminal = []
+        self.left = []
+        self.predict = [defaultdict(list) for _ in nonterminals]
+        self.empty = [[] for _ in nonterminals]
+        self.final = set()
+
+        for rule in grammar.rules:
+            left = ids[rule.left]
+            for prefix in first.first(rule.right):
+                if prefix:
+                    self.predict[left][prefix[0].symbol].append(len(self.left))
+                else:
+                    self.empty[left].append(len(self.left))
+            for sym in rule.right:
+                if isinstance(sym, Nonterminal):
+                    self.next_nonterminal.append(ids[sym])
+                    self.next_terminal.append(None)
+                else:
+                    self.next_nonterminal.append(-1)
+                    self.next_terminal.append(sym.symbol)
+                self.left.append(left)
+            if left == 0:
+                self.final.add(len(self.left))
+            self.next_nonterminal.append(-1)
+            self.next_terminal.append(None)
+            self.left.append(left)
+
+        self.size = len(self.left)
+        self.nullable = [nt in nullable for nt in nonterminals]
+        for table, empty in zip(self.predict, self.empty):
+            for starts in table.values():
+                starts.extend(empty)
+
+    def is_stale(self, grammar: CFGrammar) -> bool:
+        return (
+            grammar is not self.source
+            or grammar.start != self.source_start
+            or len(grammar.rules) != len(self.source_rules)
+            or grammar.rules != self.source_rules
+        )
+
+
+class EarleyParser:
+    """
+    Earley recognizer working on the grammar directly, with the nullable
+    nonterminals handled at prediction time as by Aycock and Horspool, so
+    rules of any length, unit rules and empty rules need no normalization.
+    Its work is linear in the length of the word for unambiguous grammars
+    of bounded lookahead, against the cubic CKY chart.
+    """
+
+    def __init__(self, grammar: CFGrammar):
+        self.grammar = grammar
+        self._tables = None
+
+    @property
+    def tables(self) -> EarleyTables:
+        if self._tables is None or self._tables.is_stale(self.grammar):
+            self._tables = EarleyTables(self.grammar)
+        return self._tables
+
+    def accepts(self, word: str) -> bool:
+        tables = self.tables
+        size = tables.size
+        next_nonterminal = tables.next_nonterminal
+        next_terminal = tables.next_terminal
+        left = tables.left
+        predict = tables.predict
+        empty = tables.empty
+        nullable = tables.nullable
+
+        waiting = []
+        items = set(predict[0].get(word[:1] or None, empty[0]))
+        for i in range(len(word) + 1):
+            char = word[i] if i < len(word) else None
+            agenda = list(items)
+            scanned = set()
+            waiting.append(defaultdict(list))
+            current_waiting = waiting[i]
+            predicted = set()
+            completed = set()
+
+            while agenda:
+                item = agenda.pop()
+                origin, dotted = divmod(item, size)
+                nonterminal = next_nonterminal[dotted]
+
+                if nonterminal >= 0:
+                    current_waiting[nonterminal].append(item)
+                    if nonterminal not in predicted:
+                        predicted.add(nonterminal)
+                        starts = predict[nonterminal].get(char, empty[nonterminal])
+                        for start in starts:
+                            new = i * size + start
+                            if new not in items:
+                                items.add(new)
+                                agenda.append(new)
+                    if nullable[nonterminal] and item + 1 not in items:
+                        items.add(item + 1)
+                        agenda.append(item + 1)
+                elif next_terminal[dotted] is not None:
+                    if next_terminal[dotted] == char:
+                        scanned.add(item + 1)
+                else:
+                    # Parents wait for a nonterminal and an origin, not for
+                    # a rule: one completion per pair is enough.
+                    key = origin * len(nullable) + left[dotted]
+                    if key in completed:
+                        continue
+                    completed.add(key)
+                    for parent in waiting[origin][left[dotted]]:
+                        if parent + 1 not in items:
+                            items.add(parent + 1)
+                            agenda.append(parent + 1)
+
+            if i == len(word):
+                return any(dotted in items for dotted in tables.final)
+            if not scanned:
+                return False
+            items = scanned
+
+        return False
+
+    def accepts_many(self, words: list[str]) -> np.ndarray:
+        return np.array([self.accepts(word) for word in words], dtype=bool)
@@ -0,0 +1,198 @@
+from .cfg_learner import CFGLearner
+from .cfg_parser import CFGParser
+from .cky_parser import CKYParser
+from .utils import get_words_from_grammar
+
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import json
+import os
+import time
+
+
+@lru_cache(maxsize=None)
+def _get_words(path: str, n_words: int) -> tuple[str, ...]:
+    # Every process keeps the words of the grammars it has already seen.
+    grammar = CFGParser().parse_grammar(path)
+    return tuple(get_words_from_grammar(grammar, max_count=n_words))
+
+
+def evaluate_job(path: str, size: int, n_words: int = 1000) -> dict:
+    """
+    Learn a grammar from the first `size` words of the grammar at `path`
+    and score it on the first `n_words` words.
+    """
+    words = _get_words(path, n_words)
+
+    start = time.perf_counter()
+    cfg = CFGLearner().strong_learn(list(words[:size]))
+    learn_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    correct = int(CKYParser(cfg).accepts_many(list(words)).sum()) if words else 0
+    score_time = time.perf_counter() - start
+
+    return {
+        "grammar": path,
+        "size": size,
+        "correct": correct,
+        "total": len(words),
+        "accuracy": correct / len(words) if words else 0.0,
+        "rules": len(cfg.rules),
+        "learn_time": learn_time,
+        "score_time": score_time,
+    }
+
+
+def load_results(path: str | Path) -> list[dict]:
+    """
+    Read the results of a previous run, ignoring a truncated last line.
+    """
+    results = []
+    if Path(path).exists():
+        with open(path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    results.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    return results
+
+
+def run(
+    grammar_paths: list[str],
+    sizes: list[int],
+    output: str | Path,
+    n_words: int = 1000,
+    n_jobs: int = 1,
+    resume: bool = False,
+) -> list[dict]:
+    """
+    Evaluate every (grammar, sample size) pair, appending one JSON line per
+    finished job to `output` as soon as it finishes. With `resume`, jobs
+    already recorded in `output` are not run again.
+    """
+    results = load_results(output) if resume else []
+    done = {(result["grammar"], result["size"]) for result in results}
+    jobs = [
+        (path, size)
+        for path in grammar_paths
+        for size in sizes
+        if (path, size) not in done
+    ]
+
+    with open(output, mode="w", encoding="utf-8") as file:
+        for result in results:
+            file.write(json.dumps(result) + "\n")
+        file.flush()
+
+        def record(result):
+            results.append(result)
+            file.write(json.dumps(result) + "\n")
+            file.flush()
+
+        if n_jobs == 1:
+            for path, size in jobs:
+                record(evaluate_job(path, size, n_words))
+        else:
+            with ProcessPoolExecutor(n_jobs) as pool:
+                futures = [
+                    pool.submit(evaluate_job, path, size, n_words)
+                    for path, size in jobs
+                ]
+                for future in as_completed(futures):
+                    record(future.result())
+
+    return results
+
+
+def aggregate(results: list[dict]) -> tuple[dict, dict]:
+    """
+    Summarize results by sample size and by grammar. A grammar counts as
+    learned by the smallest sample size that scores all of its words.
+    """
+    by_size = defaultdict(list)
+    by_grammar = defaultdict(list)
+    for result in results:
+        by_size[result["size"]].append(result)
+        by_grammar[result["grammar"]].append(result)
+
+    sizes = {
+        size: {
+            "jobs": len(group),
+            "accuracy": sum(r["accuracy"] for r in group) / len(group),
+            "learned": sum(r["correct"] == r["total"] for r in group),
+            "learn_time": sum(r["learn_time"] for r in group) / len(group),
+            "score_time": sum(r["score_time"] for r in group) / len(group),
+        }
+        for size, group in sorted(by_size.items())
+    }
+    grammars = {
+        grammar: {
+            "learned_at": min(
+                (r["size"] for r in group if r["correct"] == r["total"]), default=None
+            ),
+            "best_accuracy": max(r["accuracy"] for r in group),
+            "time": sum(r["learn_time"] + r["score_time"] for r in group),
+        }
+        for grammar, group in sorted(by_grammar.items())
+    }
+    return sizes, grammars
+
+
+def print_tables(results: list[dict]):
+    sizes, grammars = aggregate(results)
+
+    print(
+        f"{'size':>6}{'jobs':>8}{'accuracy':>10}{'learned':>9}"
+        f"{'learn, s':>10}{'score, s':>10}"
+    )
+    for size, row in sizes.items():
+        print(
+            f"{size:>6}{row['jobs']:>8}{row['accuracy']:>10.3f}{row['learned']:>9}"
+            f"{row['learn_time']:>10.3f}{row['score_time']:>10.3f}"
+        )
+
+    print(f"\n{'grammar':<40}{'learned at':>12}{'best accuracy':>15}{'time, s':>10}")
+    for grammar, row in grammars.items():
+        learned_at = "-" if row["learned_at"] is None else row["learned_at"]
+        print(
+            f"{grammar:<40}{learned_at:>12}{row['best_accuracy']:>15.3f}"
+            f"{row['time']:>10.3f}"
+        )
+
+    learned = sum(row["learned_at"] is not None for row in grammars.values())
+    print(f"\nTotal learned grammars: {learned} out of {len(grammars)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Learn the generated grammars from growing samples and score them."
+    )
+    parser.add_argument("--grammars", default="tests/generated_grammars")
+    parser.add_argument("--max-words", type=int, default=20)
+    parser.add_argument("--test-words", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="evaluation.jsonl")
+    parser.add_argument(
+        "--resume", action="store_true", help="skip jobs already in the output file"
+    )
+    args = parser.parse_args()
+
+    grammar_paths = sorted(map(str, Path(args.grammars).glob("*.txt")))
+    results = run(
+        grammar_paths,
+        list(range(1, args.max_words + 1)),
+        args.output,
+        args.test_words,
+        args.jobs,
+        args.resume,
+    )
+    print_tables(results)
+
+
+if __name__ == "__main__":
+    main()
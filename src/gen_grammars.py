@@ -1,6 +1,7 @@
 from .cfg_learner import CFGLearner
 from .cfg import CFGrammar, Nonterminal, Terminal, Rule
 from .cky_parser import CKYParser
+from .incremental_cky import context_accepts
 from .utils import to_iterable, get_words_from_grammar
 
 from collections import defaultdict
@@ -47,7 +48,7 @@ def _get_substrings_with_contexts(
 def check_approx_substitutability(grammar, restrict_time=True):
     start = time.time()
 
-    words = get_words_from_grammar(grammar)[:7]
+    words = get_words_from_grammar(grammar, max_count=7)
     contexts = defaultdict(set)
 
     for word in words:
@@ -57,12 +58,19 @@ def check_approx_substitutability(grammar, restrict_time=True):
     cky_parser = CKYParser(grammar)
     ctxs = {ctx for context_values in contexts.values() for ctx in context_values}
 
-    for ctx in ctxs:
-        for v in contexts.keys():
-            if cky_parser.accepts(ctx[0] + v + ctx[1]):
-                if restrict_time and time.time() - start > 10:
-                    return False
-                contexts[v].add(ctx)
+    substrings = list(contexts.keys())
+    right_contexts = defaultdict(list)
+    for l, r in ctxs:
+        right_contexts[l].append(r)
+
+    for l, rs in right_contexts.items():
+        chart = cky_parser.incremental(l)
+        for r in rs:
+            for v, accepted in zip(substrings, context_accepts(chart, r, substrings)):
+                if accepted:
+                    contexts[v].add((l, r))
+            if restrict_time and time.time() - start > 10:
+                return False
 
     for ctx1 in contexts.values():
         for ctx2 in contexts.values():
@@ -74,7 +82,7 @@ def check_approx_substitutability(grammar, restrict_time=True):
 
 def generate_approx_substitutable_grammar():
     random_cfg = generate_random_grammar()
-    words = get_words_from_grammar(random_cfg)
+    words = get_words_from_grammar(random_cfg, max_count=7)
     learner = CFGLearner()
 
     for i in range(7, 1, -1):
@@ -82,7 +90,7 @@ def generate_approx_substitutable_grammar():
         if (
             cfg
             and check_approx_substitutability(cfg)
-            and len(get_words_from_grammar(cfg)) > 10
+            and len(get_words_from_grammar(cfg, max_count=11)) > 10
         ):
             return cfg
 
@@ -0,0 +1,85 @@
+from .compiled_grammar import CompiledGrammar
+
+
+class IncrementalCKY:
+    """
+    A CKY chart that is built one column at a time. Column `j` holds, for
+    every start position `i <= j`, the bitmask of nonterminals deriving
+    the span from `i` to `j` inclusive. A column depends only on the
+    columns before it, so a chart can be cut back to any prefix with
+    `truncate` or copied with `fork` without recomputing shared work.
+    """
+
+    def __init__(self, grammar: CompiledGrammar, columns: list[list[int]] = None):
+        self.grammar = grammar
+        self.columns = columns or []
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def fork(self) -> "IncrementalCKY":
+        return IncrementalCKY(self.grammar, list(self.columns))
+
+    def truncate(self, length: int) -> "IncrementalCKY":
+        del self.columns[length:]
+        return self
+
+    def extend(self, symbols: str) -> "IncrementalCKY":
+        for symbol in symbols:
+            self._push(symbol)
+        return self
+
+    def _push(self, symbol: str):
+        columns = self.columns
+        combine = self.grammar.combine
+        end = len(columns)
+        column = [0] * (end + 1)
+        column[end] = self.grammar.terminal_masks.get(symbol, 0)
+
+        if column[end]:
+            for start in range(end - 1, -1, -1):
+                cell = 0
+                for split in range(start, end):
+                    left = columns[split][start]
+                    right = column[split + 1]
+                    if left and right:
+                        cell |= combine(left, right)
+                column[start] = cell
+
+        columns.append(column)
+
+    def accepts(self) -> bool:
+        if not self.columns:
+            return self.grammar.accepts_empty
+        return bool(self.columns[-1][0] & self.grammar.start_mask)
+
+
+def context_accepts(
+    chart: IncrementalCKY, right_context: str, substrings: list[str]
+) -> list[bool]:
+    """
+    For a chart already holding the left context, tell whether the grammar
+    accepts `left_context + v + right_context` for each `v` in `substrings`.
+    Substrings are visited in sorted order so that the columns of a common
+    prefix are computed once and kept while the chart is cut back.
+    """
+    prefix_length = len(chart)
+    results = [False] * len(substrings)
+    previous = ""
+
+    for idx in sorted(range(len(substrings)), key=substrings.__getitem__):
+        substring = substrings[idx]
+        common = 0
+        for a, b in zip(previous, substring):
+            if a != b:
+                break
+            common += 1
+
+        chart.truncate(prefix_length + common)
+        chart.extend(substring[common:])
+        results[idx] = chart.extend(right_context).accepts()
+        chart.truncate(prefix_length + len(substring))
+        previous = substring
+
+    chart.truncate(prefix_length)
+    return results
@@ -0,0 +1,63 @@
+from .cfg import CFGrammar
+from .cfg_learner import CFGLearner
+from .class_products import ClassProducts
+from .cky_parser import CKYParser
+from .congruence_index import CongruenceIndex
+from .context_index import ContextIndex
+from .prime_decomposition import PrimeDecomposition
+from .utils import to_iterable
+
+
+class IncrementalLearner:
+    """
+    Strong learning over a growing sample. After every `add_words` the
+    grammar is the one `CFGLearner.strong_learn` learns from all words
+    added so far, but the work of the previous samples is reused:
+
+    - the context index is extended with the new words only;
+    - the weak grammar of a larger sample has all rules of the weak grammar
+      of a smaller one, so words accepted before are accepted again without
+      parsing;
+    - primality tests and branching-rule tests are memoized by the words
+      of the classes involved, so only tests involving a class that
+      changed are computed again.
+    """
+
+    def __init__(self, learner: CFGLearner | None = None):
+        self.learner = learner if learner is not None else CFGLearner()
+        self.words = []
+        self.index = ContextIndex()
+        self.accepted = set()
+        self.products = ClassProducts(memo=True)
+        self.classes = []
+        self.grammar = None
+
+    def add_words(self, words: str | list[str]) -> CFGrammar:
+        for word in to_iterable(words):
+            if word not in self.index.index.word_ids:
+                self.words.append(word)
+                self.index.add(word)
+
+        learner = self.learner
+        components = self.index.substitution_classes()
+        weak_cfg = learner._substitution_grammar(self.words, self.index, components)
+        congruence = CongruenceIndex(
+            CKYParser(weak_cfg, learner.cache, self.accepted), components
+        )
+        classes = learner._get_congruent_classes(
+            self.words, weak_cfg, index=self.index, congruence=congruence
+        )
+
+        ids = range(len(classes))
+        prime_ids = learner._prime_ids(classes, ids, self.products)
+        decomposition = PrimeDecomposition([classes[i] for i in prime_ids])
+        decompositions = learner._decompose_ids(classes, ids, decomposition)
+        branching = learner._branching_ids(
+            classes, prime_ids, decompositions, prime_ids, self.products
+        )
+
+        self.classes = classes
+        self.grammar = learner._build_grammar(
+            self.words, classes, prime_ids, decompositions, branching
+        )
+        return self.grammar
@@ -0,0 +1,153 @@
+import resource
+import sys
+import time
+
+
+class LearningBudget:
+    """
+    Limits on one learning run: wall time in seconds, number of parsed
+    words and growth of the resident memory of the process in bytes since
+    `start`, so memory kept by earlier runs does not count. A limit of
+    None is not enforced. The learner calls `check` cooperatively inside
+    the loops of every stage; the clock and the memory are read only every
+    `check_every` calls, so checks are cheap enough for inner loops.
+    """
+
+    def __init__(
+        self,
+        seconds: float | None = None,
+        parses: int | None = None,
+        memory: int | None = None,
+        check_every: int = 64,
+    ):
+        self.seconds = seconds
+        self.parses = parses
+        self.memory = memory
+        self.check_every = check_every
+        self.used_parses = 0
+        self._started = None
+        self._base_memory = 0
+        self._calls = 0
+
+    @property
+    def limited(self) -> bool:
+        return any(x is not None for x in (self.seconds, self.parses, self.memory))
+
+    def start(self):
+        self._started = time.perf_counter()
+        self.used_parses = 0
+        self._calls = 0
+        if self.memory is not None:
+            self._base_memory = self._resident_memory()
+        return self
+
+    def elapsed(self) -> float:
+        if self._started is None:
+            return 0.0
+        return time.perf_counter() - self._started
+
+    def used_memory(self) -> int:
+        return self._resident_memory() - self._base_memory
+
+    def _resident_memory(self) -> int:
+        try:
+            with open("/proc/self/statm") as file:
+                return int(file.read().split()[1]) * resource.getpagesize()
+        except OSError:
+            # Without /proc, fall back to the peak; ru_maxrss is in bytes on
+            # macOS and in kilobytes elsewhere.
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def exhausted(self) -> str | None:
+        """
+        Name of the first exceeded limit, or None.
+        """
+        if self.parses is not None and self.used_parses > self.parses:
+            return "parses"
+        if self.seconds is not None and self.elapsed() > self.seconds:
+            return "seconds"
+        if self.memory is not None and self.used_memory() > self.memory:
+            return "memory"
+        return None
+
+    def check(self):
+        if not self.limited:
+            return
+        self._calls += 1
+        if self._calls % self.check_every and (
+            self.parses is None or self.used_parses <= self.parses
+        ):
+            return
+        reason = self.exhausted()
+        if reason is not None:
+            raise BudgetExceeded(reason)
+
+    def watch(self, iterable):
+        """
+        Iterate over `iterable`, checking the budget before every item.
+        """
+        if not self.limited:
+            yield from iterable
+            return
+        for item in iterable:
+            self.check()
+            yield item
+
+
+class LearningState:
+    """
+    Intermediate results of `CFGLearner.strong_learn`, filled in stage by
+    stage. A run started again with the same state skips finished stages;
+    the congruence classes are kept substring by substring, so an
+    interrupted congruence stage goes on where it stopped. The other
+    stages are redone from their start.
+    """
+
+    def __init__(self, words: list[str]):
+        self.words = list(words)
+        self.stage = "weak_learn"
+        self.index = None
+        self.weak_cfg = None
+        self.congruence = None
+        self.classes = None
+        self.prime_ids = None
+        self.decompositions = None
+        self.branching = None
+        self.grammar = None
+
+    def partial_grammar(self):
+        """
+        The best grammar learned so far: the result of a finished run, or
+        else the weak grammar of the sample.
+        """
+        return self.grammar if self.grammar is not None else self.weak_cfg
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised when a learning budget runs out. `state` holds what was learned
+    so far and can be passed back to the learner to resume.
+    """
+
+    def __init__(self, reason: str, state: LearningState | None = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.state = state
+
+    def __str__(self):
+        stage = f" in stage {self.state.stage}" if self.state is not None else ""
+        return f"learning budget exceeded ({self.reason}){stage}"
+
+
+class LearningResult:
+    """
+    Outcome of `CFGLearner.learn_within`: the grammar, whether learning
+    finished, and on exhaustion the exceeded limit and the state to resume.
+    """
+
+    def __init__(self, grammar, complete: bool, state: LearningState, reason=None):
+        self.grammar = grammar
+        self.complete = complete
+        self.state = state
+        self.reason = reason
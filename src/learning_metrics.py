@@ -0,0 +1,58 @@
+from contextlib import contextmanager
+from pathlib import Path
+import cProfile
+import time
+
+
+class LearningMetrics:
+    """
+    Wall time per stage and counters of one learning run. Every stage run
+    through `stage` is timed, reported to each callback as
+    `callback(stage, seconds, metrics)` and, with `profile_dir`, profiled
+    with cProfile into `<profile_dir>/<stage>.prof`.
+    """
+
+    def __init__(self, callbacks=(), profile_dir: str | Path | None = None):
+        self.times = {}
+        self.counts = {}
+        self.cache = {}
+        self.callbacks = list(callbacks)
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
+
+    @contextmanager
+    def stage(self, name: str):
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield self
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            seconds = time.perf_counter() - start
+            self.times[name] = self.times.get(name, 0.0) + seconds
+            if profiler is not None:
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(self.profile_dir / f"{name}.prof")
+            for callback in self.callbacks:
+                callback(name, seconds, self)
+
+    def count(self, name: str, value: int):
+        self.counts[name] = value
+
+    def as_dict(self) -> dict:
+        return {"times": self.times, "counts": self.counts, "cache": self.cache}
+
+    def report(self) -> str:
+        total = sum(self.times.values())
+        lines = [f"{'stage':<20}{'time, s':>10}{'share':>8}"]
+        for name, seconds in self.times.items():
+            share = seconds / total if total else 0.0
+            lines.append(f"{name:<20}{seconds:>10.4f}{share:>8.1%}")
+        lines.append(f"{'total':<20}{total:>10.4f}")
+        lines.extend(f"{name:<20}{value:>10}" for name, value in self.counts.items())
+        lines.extend(
+            f"{'cache ' + name:<20}{value:>10}" for name, value in self.cache.items()
+        )
+        return "\n".join(lines)
@@ -0,0 +1,161 @@
+from .compiled_grammar import CompiledGrammar
+
+import numpy as np
+
+
+class MatrixParser:
+    """
+    Recognizer reducing CKY to boolean matrix multiplication, after Valiant
+    in the formulation of Okhotin. The chart holds a matrix over word
+    positions for every nonterminal, and it is filled by splitting it into
+    blocks recursively: every block is completed by a few products of
+    blocks already known, one batched NumPy product for all (B, C) pairs of
+    the grammar at once. Large blocks near the top of the chart thus turn
+    into a handful of large products instead of a cubic loop over spans.
+    Blocks of at most `leaf` positions are filled directly, one diagonal of
+    independent spans at a time.
+
+    The chart has |N| * (n + 1)^2 cells for a word of n symbols; words
+    whose chart would exceed `max_cells`, one byte each, are refused with
+    a ValueError, see `fits`.
+    """
+
+    def __init__(
+        self, grammar: CompiledGrammar, leaf: int = 16, max_cells: int = 1 << 27
+    ):
+        self.grammar = grammar
+        self.leaf = leaf
+        self.max_cells = max_cells
+
+    def cells(self, length: int) -> int:
+        return len(self.grammar.nonterminals) * (length + 1) ** 2
+
+    def fits(self, length: int) -> bool:
+        return self.cells(length) <= self.max_cells
+
+    def accepts(self, word: str) -> bool:
+        grammar = self.grammar
+        if not word:
+            return grammar.accepts_empty
+
+        if not self.fits(len(word)):
+            raise ValueError(
+                f"Chart of {self.cells(len(word))} cells exceeds max_cells "
+                f"({self.max_cells})"
+            )
+
+        arrays = grammar.arrays
+        terminal_index = arrays["terminal_index"]
+        if any(char not in terminal_index for char in word):
+            return False
+
+        # chart[A, i, j] is set if A derives word[i:j]. Blocks are turned
+        # into floats only to be multiplied.
+        size = len(word) + 1
+        chart = np.zeros((len(grammar.nonterminals), size, size), dtype=bool)
+        for idx, char in enumerate(word):
+            chart[:, idx, idx + 1] = arrays["terminals"][terminal_index[char]]
+
+        self._chart = chart
+        self._spans = chart.any(axis=0)
+        self._left = arrays["left"]
+        self._right = arrays["right"]
+        self._parents = arrays["parents"].T.astype(np.float32)
+        try:
+            self._compute(0, size)
+            return bool(chart[grammar.start_id, 0, len(word)])
+        finally:
+            del self._chart, self._spans
+
+    def _compute(self, low: int, high: int):
+        # Fills all spans inside positions [low, high).
+        if high - low <= self.leaf:
+            splits = np.arange(low, high)
+            for length in range(2, high - low):
+                starts = np.arange(low, high - length)
+                self._fill(starts, starts + length, splits)
+            return
+        if high - low >= 4:
+            middle = (low + high) // 2
+            self._compute(low, middle)
+            self._compute(middle, high)
+        middle = (low + high) // 2
+        self._complete(low, middle, middle, high)
+
+    def _complete(self, low: int, high: int, low2: int, high2: int):
+        # Fills the block of spans starting in [low, high) and ending in
+        # [low2, high2), given the spans inside [low, high) and [low2, high2)
+        # and the contributions of all splits in [high, low2).
+        if high - low <= self.leaf:
+            # Spans on one diagonal of the block depend only on spans of
+            # the previous diagonals and of the blocks on the main diagonal.
+            splits = np.r_[low:high, low2:high2]
+            for diagonal in range(high - low + high2 - low2 - 1):
+                starts = np.arange(high - 1, low - 1, -1)
+                ends = low2 + diagonal - np.arange(high - low)
+                keep = (ends >= low2) & (ends < high2)
+                self._fill(starts[keep], ends[keep], splits)
+            return
+        middle = (low + high) // 2
+        middle2 = (low2 + high2) // 2
+        top, bottom = (low, middle), (middle, high)
+        left, right = (low2, middle2), (middle2, high2)
+
+        self._complete(*bottom, *left)
+        self._multiply(top, bottom, left)
+        self._complete(*top, *left)
+        self._multiply(bottom, left, right)
+        self._complete(*bottom, *right)
+        self._multiply(top, bottom, right)
+        self._multiply(top, left, right)
+        self._complete(*top, *right)
+
+    def _multiply(self, rows: tuple, splits: tuple, columns: tuple):
+        # Adds the spans of the block (rows, columns) split at the positions
+        # of `splits`, for every rule A -> B C at once.
+        chart, spans = self._chart, self._spans
+        rows, splits, columns = slice(*rows), slice(*splits), slice(*columns)
+        if not (
+            spans[rows, splits].any(axis=0) & spans[splits, columns].any(axis=1)
+        ).any():
+            return
+        first = chart[:, rows, splits]
+        second = chart[:, splits, columns]
+        pairs = self._pairs(first, second)
+        if pairs is None:
+            return
+        first = first.astype(np.float32)[self._left[pairs]]
+        second = second.astype(np.float32)[self._right[pairs]]
+        found = np.tensordot(self._parents[:, pairs], first @ second, axes=1) > 0
+        block = chart[:, rows, columns]
+        block |= found
+        spans[rows, columns] = block.any(axis=0)
+
+    def _fill(self, starts: np.ndarray, ends: np.ndarray, splits: np.ndarray):
+        # Adds the spans (starts[c], ends[c]) split at any of `splits`. The
+        # chart is empty below the diagonal, so splits outside a span count
+        # for nothing.
+        chart, spans = self._chart, self._spans
+        # A span needs a split with both of its parts derived by something.
+        if not (spans[starts[:, None], splits] & spans[splits[:, None], ends].T).any():
+            return
+        first = chart[:, starts[:, None], splits]
+        second = chart[:, splits[:, None], ends]
+        pairs = self._pairs(first, second)
+        if pairs is None:
+            return
+        first = first.astype(np.float32)[self._left[pairs]]
+        second = second.astype(np.float32)[self._right[pairs]]
+        hits = np.einsum("pck,pkc->pc", first, second)
+        cells = chart[:, starts, ends] | (self._parents[:, pairs] @ hits > 0)
+        chart[:, starts, ends] = cells
+        spans[starts, ends] = cells.any(axis=0)
+
+    def _pairs(self, first: np.ndarray, second: np.ndarray) -> np.ndarray | None:
+        # Indices of the (B, C) pairs with B present in `first` and C in
+        # `second`, or None if there are none. Charts of words outside the
+        # language are mostly empty, so this skips most of the work.
+        present_first = first.any(axis=(1, 2))
+        present_second = second.any(axis=(1, 2))
+        pairs = np.flatnonzero(present_first[self._left] & present_second[self._right])
+        return pairs if len(pairs) else None
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+
+class MembershipCache:
+    """
+    Bounded LRU memo of membership answers keyed by a grammar fingerprint
+    and a word. The cache is limited both by the number of entries and by
+    the total length of the cached words; the least recently used entries
+    are evicted first. One cache can be shared by several parsers, and
+    parsers built from equal grammars then reuse each other's answers.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000, max_chars: int = 2**26):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.chars = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, fingerprint: str, word: str) -> bool | None:
+        key = (fingerprint, word)
+        accepted = self._entries.get(key)
+        if accepted is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return accepted
+
+    def put(self, fingerprint: str, word: str, accepted: bool):
+        key = (fingerprint, word)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        else:
+            self.chars += len(word)
+        self._entries[key] = bool(accepted)
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.chars > self.max_chars
+        ):
+            (_, evicted), _ = self._entries.popitem(last=False)
+            self.chars -= len(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.chars = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "chars": self.chars,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
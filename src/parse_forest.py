@@ -0,0 +1,294 @@
+from .cfg import CFGrammar, Nonterminal, Terminal
+
+from collections import defaultdict
+from math import inf, prod
+
+from nltk import Tree
+
+
+class ParseForest:
+    """
+    Shared packed parse forest of a word for the rules of a grammar as they
+    are, without a conversion to CNF, so that derivations and trees are
+    those of the grammar itself. A node `(A, start, end)` stands for all
+    derivations of `word[start:end]` from A and lists the ids of the rules
+    of A deriving it. Rules are packed through their prefixes: an item
+    `(rule, dot, start, end)` stands for all derivations of
+    `word[start:end]` from the first `dot` symbols of the rule and keeps
+    the positions where its last symbol starts. Only nodes and items
+    reachable from the root are kept, so the forest is at most the size of
+    the chart, however many trees it packs.
+
+    Empty and unit rules may form cycles, such as A -> B, B -> A. A word
+    derived through a cycle has infinitely many derivations: its count is
+    `math.inf` and its trees cannot be listed.
+    """
+
+    def __init__(self, grammar: CFGrammar, word: str):
+        self.grammar = grammar
+        self.word = word
+        self.rules = list(dict.fromkeys(grammar.rules))
+        self._rights = [rule.right for rule in self.rules]
+        self.root = (grammar.start, 0, len(word))
+        self.nodes = {}
+        self.items = {}
+        self._counts = None
+
+        found, items = self._chart(word)
+        if grammar.start in found[0, len(word)]:
+            self._reachable(found, items)
+
+    def _chart(self, word: str) -> tuple[dict, dict]:
+        # found[i, j] maps every nonterminal deriving word[i:j] to the ids
+        # of its rules that do; items[i, j] maps every (rule, dot) whose
+        # prefix derives word[i:j] to the start positions of its last symbol.
+        rules = self.rules
+        nullable = CFGrammar.get_nullable_nonterminals(self.grammar)
+        n = len(word)
+
+        # Empty spans are the same at every position: the prefixes made of
+        # nullable symbols, and the nonterminals with such a whole rule.
+        empty_items = []
+        empty_found = defaultdict(list)
+        empty_waiting = defaultdict(list)
+        for r, rule in enumerate(rules):
+            for d, sym in enumerate(rule.right):
+                empty_items.append((r, d))
+                empty_waiting[sym].append((r, d))
+                if sym not in nullable:
+                    break
+            else:
+                empty_items.append((r, len(rule.right)))
+                empty_found[rule.left].append(r)
+
+        found, items, waiting = {}, {}, {}
+        for i in range(n + 1):
+            found[i, i] = {left: list(ids) for left, ids in empty_found.items()}
+            items[i, i] = {key: [i] if key[1] else [] for key in empty_items}
+            waiting[i, i] = empty_waiting
+        chars = [Terminal(char) for char in word]
+
+        for length in range(1, n + 1):
+            for i in range(n - length + 1):
+                j = i + length
+                span_found, span_items = {}, {}
+                agenda = []
+
+                def add(r, d, k):
+                    if (r, d) in span_items:
+                        span_items[r, d].append(k)
+                    else:
+                        span_items[r, d] = [k]
+                        agenda.append((r, d))
+
+                # Items whose last symbol starts inside the span need only
+                # shorter spans.
+                for k in range(i + 1, j):
+                    expecting = waiting[i, k]
+                    for nonterminal in found[k, j].keys() & expecting.keys():
+                        for r, d in expecting[nonterminal]:
+                            add(r, d + 1, k)
+                for r, d in waiting[i, j - 1].get(chars[j - 1], ()):
+                    add(r, d + 1, j - 1)
+
+                # The others take the whole span with one symbol and the
+                # empty word with the rest, and are closed over.
+                while agenda:
+                    r, d = agenda.pop()
+                    rule = rules[r]
+                    if d == len(rule.right):
+                        if rule.left in span_found:
+                            span_found[rule.left].append(r)
+                            continue
+                        span_found[rule.left] = [r]
+                        for r2, d2 in empty_waiting.get(rule.left, ()):
+                            add(r2, d2 + 1, i)
+                    elif rule.right[d] in nullable:
+                        add(r, d + 1, j)
+
+                expecting = defaultdict(list)
+                for r, d in span_items:
+                    if d < len(rules[r].right):
+                        expecting[rules[r].right[d]].append((r, d))
+                found[i, j], items[i, j], waiting[i, j] = (
+                    span_found,
+                    span_items,
+                    expecting,
+                )
+
+        return found, items
+
+    def _reachable(self, found, items):
+        nodes, forest_items, rights = self.nodes, self.items, self._rights
+        nodes[self.root] = sorted(found[0, len(self.word)][self.root[0]])
+        to_process = [self.root]
+        while to_process:
+            node = to_process.pop()
+            if len(node) == 3:
+                left, start, end = node
+                for r in nodes[node]:
+                    item = (r, len(rights[r]), start, end)
+                    if item not in forest_items:
+                        forest_items[item] = sorted(items[start, end][r, item[1]])
+                        to_process.append(item)
+                continue
+            r, d, start, end = node
+            if d == 0:
+                continue
+            sym = rights[r][d - 1]
+            for k in forest_items[node]:
+                prefix = (r, d - 1, start, k)
+                if prefix not in forest_items:
+                    forest_items[prefix] = sorted(items[start, k][r, d - 1])
+                    to_process.append(prefix)
+                child = (sym, k, end)
+                if isinstance(sym, Nonterminal) and child not in nodes:
+                    nodes[child] = sorted(found[k, end][sym])
+                    to_process.append(child)
+
+    def __bool__(self):
+        return bool(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _alternatives(self, node) -> list[list]:
+        # The children of every packed alternative of a node or an item,
+        # leaving out terminals, which have one derivation each.
+        if len(node) == 3:
+            left, start, end = node
+            return [[(r, len(self._rights[r]), start, end)] for r in self.nodes[node]]
+        r, d, start, end = node
+        if d == 0:
+            return [[]]
+        sym = self._rights[r][d - 1]
+        return [
+            [(r, d - 1, start, k)]
+            + ([(sym, k, end)] if isinstance(sym, Nonterminal) else [])
+            for k in self.items[node]
+        ]
+
+    @property
+    def counts(self) -> dict:
+        """
+        Number of derivations of every node and item, by dynamic
+        programming in a depth-first post-order from the root. A child
+        still being visited closes a cycle, and every node reaching a
+        cycle has infinitely many derivations.
+        """
+        if self._counts is None:
+            counts = {}
+            # Alternatives of the nodes being visited, by node.
+            active = {}
+            stack = [self.root] if self.nodes else []
+            while stack:
+                node = stack[-1]
+                if node in counts:
+                    stack.pop()
+                elif node not in active:
+                    active[node] = self._alternatives(node)
+                    for alternative in active[node]:
+                        stack.extend(
+                            child
+                            for child in alternative
+                            if child not in counts and child not in active
+                        )
+                else:
+                    stack.pop()
+                    total = 0
+                    for alternative in active[node]:
+                        factors = [
+                            inf if child in active else counts[child]
+                            for child in alternative
+                        ]
+                        if inf in factors:
+                            total = inf
+                            break
+                        total += prod(factors)
+                    counts[node] = total
+                    del active[node]
+            self._counts = counts
+        return self._counts
+
+    def count(self) -> int | float:
+        """
+        Number of derivations of the word, 0 if it is not accepted and
+        `math.inf` if it is derived through a cycle.
+        """
+        return self.counts.get(self.root, 0)
+
+    def is_ambiguous(self) -> bool:
+        return self.count() > 1
+
+    def _check_finite(self):
+        if self.count() == inf:
+            raise ValueError("The word has infinitely many derivations")
+
+    def trees(self):
+        """
+        Yield the derivation trees one by one, in the order of the rules
+        and then of the split positions. Subtrees are generated on demand,
+        so memory grows with the depth of a tree only.
+        """
+        if self.nodes:
+            self._check_finite()
+            yield from self._trees(self.root)
+
+    def _trees(self, node):
+        left, start, end = node
+        for r in self.nodes[node]:
+            item = (r, len(self.rules[r].right), start, end)
+            for children in self._item_trees(item):
+                yield Tree(str(left), children)
+
+    def _item_trees(self, item):
+        r, d, start, end = item
+        if d == 0:
+            yield []
+            return
+        sym = self.rules[r].right[d - 1]
+        for k in self.items[item]:
+            for prefix in self._item_trees((r, d - 1, start, k)):
+                if isinstance(sym, Nonterminal):
+                    for child in self._trees((sym, k, end)):
+                        yield prefix + [child]
+                else:
+                    yield prefix + [sym.symbol]
+
+    def tree(self, index: int) -> Tree:
+        """
+        The tree `trees()` yields at position `index`, found with the
+        derivation counts without generating the trees before it.
+        """
+        self._check_finite()
+        if not 0 <= index < self.count():
+            raise IndexError("tree index out of range")
+        return self._tree(self.root, index)
+
+    def _tree(self, node, index: int) -> Tree:
+        left, start, end = node
+        for r in self.nodes[node]:
+            item = (r, len(self.rules[r].right), start, end)
+            if index < self.counts[item]:
+                return Tree(str(left), self._item_tree(item, index))
+            index -= self.counts[item]
+
+    def _item_tree(self, item, index: int) -> list:
+        r, d, start, end = item
+        if d == 0:
+            return []
+        counts = self.counts
+        sym = self.rules[r].right[d - 1]
+        for k in self.items[item]:
+            prefix = (r, d - 1, start, k)
+            child = (sym, k, end)
+            child_count = counts[child] if isinstance(sym, Nonterminal) else 1
+            total = counts[prefix] * child_count
+            if index < total:
+                children = self._item_tree(prefix, index // child_count)
+                if isinstance(sym, Nonterminal):
+                    children.append(self._tree(child, index % child_count))
+                else:
+                    children.append(sym.symbol)
+                return children
+            index -= total
@@ -0,0 +1,73 @@
+from .cfg import CongruentClass
+
+
+class PrimeDecomposition:
+    """
+    Decomposition of strings into the fewest words of prime classes. The
+    words of all prime classes are stored in a trie, so the segments
+    starting at a position are found in one walk down the trie, and a
+    decomposition is a shortest path over the positions of the string,
+    found by a forward pass since segments only move forward. Among
+    shortest decompositions, the one with the earliest cut before each
+    segment is chosen. Decompositions are memoized by string.
+    """
+
+    def __init__(self, prime_classes: list[CongruentClass]):
+        self.trie = [{}]
+        self.class_at = {}
+        self._decompositions = {}
+
+        for cls in prime_classes:
+            for word in cls.words:
+                node = 0
+                for char in word:
+                    if char not in self.trie[node]:
+                        self.trie[node][char] = len(self.trie)
+                        self.trie.append({})
+                    node = self.trie[node][char]
+                self.class_at[node] = cls
+
+    def segments(self, string: str, start: int):
+        """
+        Yield `(end, cls)` for every word `string[start:end]` of a prime
+        class `cls`.
+        """
+        node = 0
+        for end in range(start, len(string)):
+            node = self.trie[node].get(string[end])
+            if node is None:
+                return
+            if node in self.class_at:
+                yield end + 1, self.class_at[node]
+
+    def decompose(self, string: str) -> list[CongruentClass]:
+        if string in self._decompositions:
+            return self._decompositions[string]
+
+        n = len(string)
+        distance = [0] + [n + 1] * n
+        previous = [None] * (n + 1)
+
+        for start in range(n):
+            if distance[start] > n:
+                continue
+            for end, cls in self.segments(string, start):
+                if distance[start] + 1 < distance[end]:
+                    distance[end] = distance[start] + 1
+                    previous[end] = (start, cls)
+
+        if not string or previous[n] is None:
+            raise ValueError(f"{string!r} has no decomposition into prime classes")
+
+        decomposition = []
+        end = n
+        while end:
+            end, cls = previous[end]
+            decomposition.append(cls)
+        self._decompositions[string] = decomposition[::-1]
+        return self._decompositions[string]
+
+    def decompose_all(
+        self, classes: list[CongruentClass]
+    ) -> dict[str, list[CongruentClass]]:
+        return {cls.rep: self.decompose(cls.rep) for cls in classes}
@@ -0,0 +1,174 @@
+from .cfg import CFGrammar
+from .cfg_parser import CFGParser
+from .cky_parser import CKYParser
+
+from pathlib import Path
+import argparse
+import sys
+import time
+
+
+def read_words(path: str | Path, buffer_size: int = 1 << 20):
+    """
+    Yield the words of a newline-delimited file one by one through a
+    buffered reader, so only one buffer of the file is in memory. An empty
+    line is the empty word.
+    """
+    with open(path, mode="rb", buffering=buffer_size) as file:
+        for line in file:
+            yield line.rstrip(b"\r\n").decode("utf-8")
+
+
+def batches(words, batch_size: int, max_spans: int | None = None):
+    """
+    Group words into lists of at most `batch_size` words whose squared
+    lengths add up to at most `max_spans`. A word longer than that is a
+    batch of its own.
+    """
+    batch, spans = [], 0
+    for word in words:
+        if batch and (
+            len(batch) == batch_size
+            or max_spans is not None
+            and spans + len(word) ** 2 > max_spans
+        ):
+            yield batch
+            batch, spans = [], 0
+        batch.append(word)
+        spans += len(word) ** 2
+    if batch:
+        yield batch
+
+
+class ScoreStats:
+    """
+    Running totals of a scoring run: words read, words accepted, symbols
+    parsed and elapsed wall time.
+    """
+
+    def __init__(self):
+        self.words = 0
+        self.accepted = 0
+        self.symbols = 0
+        self.seconds = 0.0
+
+    @property
+    def accuracy(self) -> float:
+        return self.accepted / self.words if self.words else 0.0
+
+    @property
+    def words_per_second(self) -> float:
+        return self.words / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "words": self.words,
+            "accepted": self.accepted,
+            "accuracy": self.accuracy,
+            "seconds": self.seconds,
+            "words_per_second": self.words_per_second,
+        }
+
+    def __str__(self):
+        return (
+            f"{self.words} words, {self.accepted} accepted "
+            f"({self.accuracy:.2%}), {self.words_per_second:.0f} words/s"
+        )
+
+
+def score_stream(
+    parser: CKYParser, words, batch_size: int = 4096, max_spans: int | None = 1 << 22
+):
+    """
+    Score a stream of words batch by batch and yield the running `ScoreStats`
+    after every batch. `accepts_many` groups each batch by word length, and
+    nothing but the current batch is kept, so memory does not grow with the
+    corpus. The chart of a batch has about n^2 / 2 spans per word of n
+    symbols, each with a cell per nonterminal, so batches are also cut
+    to at most `max_spans` squared word lengths: memory stays within
+    about `max_spans` bytes per nonterminal and binary rule, whatever the
+    lengths of the words.
+    """
+    stats = ScoreStats()
+    start = time.perf_counter()
+    for batch in batches(words, batch_size, max_spans):
+        stats.accepted += int(parser.accepts_many(batch).sum())
+        stats.words += len(batch)
+        stats.symbols += sum(map(len, batch))
+        stats.seconds = time.perf_counter() - start
+        yield stats
+
+
+def score_corpus(
+    grammar: CFGrammar,
+    path: str | Path,
+    batch_size: int = 4096,
+    backend: str = "cky",
+    callback=None,
+    max_spans: int | None = 1 << 22,
+    matrix_length: int | None = None,
+) -> ScoreStats:
+    """
+    Fraction of the words of the file at `path` accepted by `grammar`.
+    `callback(stats)` is called after every batch.
+    """
+    stats = ScoreStats()
+    parser = CKYParser(grammar, backend=backend, matrix_length=matrix_length)
+    for stats in score_stream(parser, read_words(path), batch_size, max_spans):
+        if callback is not None:
+            callback(stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score a newline-delimited word file against a grammar."
+    )
+    parser.add_argument("grammar", help="grammar file in the format of CFGParser")
+    parser.add_argument("corpus", help="file with one word per line")
+    parser.add_argument(
+        "--batch-size", type=int, default=4096, help="most words parsed at once"
+    )
+    parser.add_argument(
+        "--max-spans",
+        type=int,
+        default=1 << 22,
+        help="most squared word lengths in a batch, which bounds its chart",
+    )
+    parser.add_argument(
+        "--matrix-length",
+        type=int,
+        default=None,
+        help="parse words of at least that many symbols by matrix multiplication",
+    )
+    parser.add_argument("--backend", choices=CKYParser.BACKENDS, default="cky")
+    parser.add_argument(
+        "--report-every",
+        type=int,
+        default=100000,
+        help="print running statistics every that many words",
+    )
+    args = parser.parse_args()
+
+    reported = 0
+
+    def report(stats):
+        nonlocal reported
+        if stats.words - reported >= args.report_every:
+            reported = stats.words
+            print(stats, file=sys.stderr)
+
+    stats = score_corpus(
+        CFGParser().parse_grammar(args.grammar),
+        args.corpus,
+        args.batch_size,
+        args.backend,
+        report,
+        args.max_spans,
+        args.matrix_length,
+    )
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+from bisect import bisect_right
+
+
+class SubstringIndex:
+    """
+    Generalized suffix automaton over a sample of words, with tries over
+    the prefixes and the suffixes of the words.
+
+    Every distinct substring reaches exactly one automaton state and is
+    identified by the end of its first occurrence in the sample together
+    with its length, packed into one integer. Prefixes and suffixes are
+    identified by their trie nodes. All of these are computed without
+    slicing the words, and strings are built only by `text`, `prefix` and
+    `suffix`. Ids stay valid when more words are added.
+    """
+
+    LENGTH_BITS = 20
+
+    def __init__(self, words: list[str] | None = None):
+        self.words = []
+        self.word_ids = {}
+        self.offsets = []
+        self.size = 0
+
+        self.next = [{}]
+        self.link = [-1]
+        self.length = [0]
+        self.first_end = [0]
+
+        self.prefix_trie = [{}]
+        self.prefix_first = [(0, 0)]
+        self.suffix_trie = [{}]
+        self.suffix_first = [(0, 0)]
+        self.prefix_nodes = []
+        self.suffix_nodes = []
+
+        for word in words or []:
+            self.add(word)
+
+    def add(self, word: str) -> int:
+        if word in self.word_ids:
+            return self.word_ids[word]
+
+        word_id = len(self.words)
+        self.words.append(word)
+        self.word_ids[word] = word_id
+        self.offsets.append(self.size)
+
+        last = 0
+        for pos, char in enumerate(word):
+            last = self._extend(last, char, self.size + pos + 1)
+        self.size += len(word)
+
+        self.prefix_nodes.append(
+            self._insert(self.prefix_trie, self.prefix_first, word, word_id)
+        )
+        self.suffix_nodes.append(
+            self._insert(self.suffix_trie, self.suffix_first, word[::-1], word_id)[::-1]
+        )
+
+        return word_id
+
+    def _new_state(self, length, first_end, transitions=None, link=-1):
+        self.next.append(transitions or {})
+        self.link.append(link)
+        self.length.append(length)
+        self.first_end.append(first_end)
+        return len(self.length) - 1
+
+    def _clone(self, state, char):
+        q = self.next[state][char]
+        clone = self._new_state(
+            self.length[state] + 1, self.first_end[q], dict(self.next[q]), self.link[q]
+        )
+        while state != -1 and self.next[state].get(char) == q:
+            self.next[state][char] = clone
+            state = self.link[state]
+        self.link[q] = clone
+        return clone
+
+    def _extend(self, last, char, end):
+        if char in self.next[last]:
+            q = self.next[last][char]
+            if self.length[q] == self.length[last] + 1:
+                return q
+            return self._clone(last, char)
+
+        cur = self._new_state(self.length[last] + 1, end)
+        state = last
+        while state != -1 and char not in self.next[state]:
+            self.next[state][char] = cur
+            state = self.link[state]
+
+        if state == -1:
+            self.link[cur] = 0
+        else:
+            q = self.next[state][char]
+            if self.length[state] + 1 == self.length[q]:
+                self.link[cur] = q
+            else:
+                self.link[cur] = self._clone(state, char)
+
+        return cur
+
+    @staticmethod
+    def _insert(trie, first, word, word_id):
+        node = 0
+        nodes = [node]
+        for pos, char in enumerate(word):
+            if char not in trie[node]:
+                trie[node][char] = len(trie)
+                trie.append({})
+                first.append((word_id, pos + 1))
+            node = trie[node][char]
+            nodes.append(node)
+        return nodes
+
+    def _substring_id(self, state, length):
+        return (self.first_end[state] << self.LENGTH_BITS) | length
+
+    def substring_length(self, substring_id: int) -> int:
+        return substring_id & ((1 << self.LENGTH_BITS) - 1)
+
+    def text(self, substring_id: int) -> str:
+        length = self.substring_length(substring_id)
+        end = substring_id >> self.LENGTH_BITS
+        word_id = bisect_right(self.offsets, end - 1) - 1
+        end -= self.offsets[word_id]
+        return self.words[word_id][end - length : end]
+
+    def prefix(self, node: int) -> str:
+        word_id, length = self.prefix_first[node]
+        return self.words[word_id][:length]
+
+    def suffix(self, node: int) -> str:
+        word_id, length = self.suffix_first[node]
+        return self.words[word_id][len(self.words[word_id]) - length :]
+
+    def find(self, substring: str) -> int | None:
+        state = 0
+        for char in substring:
+            state = self.next[state].get(char)
+            if state is None:
+                return None
+        return self._substring_id(state, len(substring)) if substring else None
+
+    def substrings(self):
+        for state in range(1, len(self.length)):
+            for length in range(
+                self.length[self.link[state]] + 1, self.length[state] + 1
+            ):
+                yield self._substring_id(state, length)
+
+    def spans(self, word_id: int):
+        """
+        Yield `(i, j, substring_id)` for every span `word[i:j]` of a word.
+        """
+        word = self.words[word_id]
+        for i in range(len(word)):
+            state = 0
+            for j in range(i, len(word)):
+                state = self.next[state][word[j]]
+                yield i, j + 1, self._substring_id(state, j + 1 - i)
+
+    def splits(self, substring_id: int):
+        """
+        Yield `(left_id, right_id)` for every split of a substring into two
+        non-empty parts, in order of increasing left length.
+        """
+        substring = self.text(substring_id)
+        length = len(substring)
+        states = [0]
+        for char in substring:
+            states.append(self.next[states[-1]][char])
+
+        # Suffixes of the substring are found by climbing suffix links from
+        # its state, so the right parts are visited from longest to shortest.
+        suffix_state = states[-1]
+        for split in range(1, length):
+            suffix_length = length - split
+            while self.length[self.link[suffix_state]] >= suffix_length:
+                suffix_state = self.link[suffix_state]
+            yield (
+                self._substring_id(states[split], split),
+                self._substring_id(suffix_state, suffix_length),
+            )
@@ -0,0 +1,124 @@
+from .cfg import CFGrammar
+
+from collections import defaultdict
+from itertools import count
+
+
+class WordEnumerator:
+    """
+    Distinct words of a grammar in nondecreasing length. The words are
+    built on the CNF of the grammar, which has no empty or unit rules
+    except for the start, so the words of a nonterminal of a given length
+    come only from shorter words of other nonterminals:
+
+        words(A, n) = {a : A -> a} if n == 1, else
+                      {uv : A -> B C, u in words(B, i), v in words(C, n - i)}
+
+    Sets of words are computed on demand for the (nonterminal, length)
+    pairs actually needed and kept in insertion order; the CNF rules come
+    in the order of the rules of the grammar, so the order of the words is
+    the same in every run on the same grammar.
+    """
+
+    def __init__(self, grammar: CFGrammar):
+        cnf = CFGrammar.to_chomsky_normal_form(grammar)
+        self.start = cnf.start
+        self.accepts_empty = False
+        self.terminal_rules = defaultdict(list)
+        self.binary_rules = defaultdict(list)
+
+        for rule in cnf.rules:
+            if len(rule.right) == 2:
+                self.binary_rules[rule.left].append(tuple(rule.right))
+            elif len(rule.right) == 1:
+                self.terminal_rules[rule.left].append(rule.right[0].symbol)
+            elif rule.left == self.start:
+                self.accepts_empty = True
+
+        self.longest = self._get_longest()
+        self._words = {}
+
+    def _get_longest(self) -> int | None:
+        """
+        Length of the longest word of the start, None if the language is
+        infinite. In CNF every rule on a cycle makes words longer, so the
+        language is infinite iff a cycle is reachable from the start.
+        """
+        longest = {}
+        # Nonterminals on the path from the start, walked with an explicit
+        # stack so that deep grammars do not hit the recursion limit.
+        visiting = set()
+        stack = [self.start]
+        while stack:
+            nonterminal = stack[-1]
+            if nonterminal in longest:
+                stack.pop()
+            elif nonterminal not in visiting:
+                visiting.add(nonterminal)
+                for pair in self.binary_rules[nonterminal]:
+                    for child in pair:
+                        if child in visiting:
+                            return None
+                        if child not in longest:
+                            stack.append(child)
+            else:
+                stack.pop()
+                visiting.discard(nonterminal)
+                longest[nonterminal] = max(
+                    [1 if self.terminal_rules[nonterminal] else 0]
+                    + [
+                        longest[left] + longest[right]
+                        for left, right in self.binary_rules[nonterminal]
+                    ]
+                )
+        return longest[self.start]
+
+    def words_of(self, nonterminal, length: int) -> list[str]:
+        key = (nonterminal, length)
+        if key not in self._words:
+            self._words[key] = list(dict.fromkeys(self._generate(*key)))
+        return self._words[key]
+
+    def _generate(self, nonterminal, length: int):
+        if length == 1:
+            yield from self.terminal_rules[nonterminal]
+            return
+        for left, right in self.binary_rules[nonterminal]:
+            for split in range(1, length):
+                prefixes = self.words_of(left, split)
+                if not prefixes:
+                    continue
+                suffixes = self.words_of(right, length - split)
+                for prefix in prefixes:
+                    for suffix in suffixes:
+                        yield prefix + suffix
+
+    def words(self, max_length: int | None = None, max_count: int | None = None):
+        """
+        Yield the words of the language, shortest first, up to `max_length`
+        terminals and `max_count` words. The words of the start symbol are
+        yielded while they are generated, so the words of the last length
+        reached are not built beyond `max_count`.
+        """
+        if max_count is not None and max_count <= 0:
+            return
+        yielded = 0
+        if self.accepts_empty:
+            yield ""
+            yielded += 1
+            if yielded == max_count:
+                return
+
+        limits = [x for x in (max_length, self.longest) if x is not None]
+        for length in count(1):
+            if limits and length > min(limits):
+                return
+            seen = set()
+            for word in self._generate(self.start, length):
+                if word in seen:
+                    continue
+                seen.add(word)
+                yield word
+                yielded += 1
+                if yielded == max_count:
+                    return
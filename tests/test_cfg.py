@@ -0,0 +1,153 @@
+from src.cfg import CFGrammar, Nonterminal, Terminal, Rule, CongruentClass
+from src.cky_parser import CKYParser
+
+from itertools import product
+import pickle
+import re
+
+
+def test_symbols_are_interned():
+    assert Nonterminal("[[a]]") is Nonterminal("[[a]]")
+    assert Terminal("a") is Terminal("a")
+    assert Nonterminal("a") != Terminal("a")
+    assert Nonterminal("A", mark=Nonterminal("B")) is not Nonterminal("A")
+    assert Nonterminal("A").id != Terminal("A").id
+    assert pickle.loads(pickle.dumps(Nonterminal("[[ab]]"))) is Nonterminal("[[ab]]")
+
+
+def test_rules():
+    rule = Rule(Nonterminal("S"), [Nonterminal("[[a]]"), Terminal("b")])
+    assert rule.left is Nonterminal("S")
+    assert rule.right == (Nonterminal("[[a]]"), Terminal("b"))
+    assert rule == Rule(Nonterminal("S"), (Nonterminal("[[a]]"), Terminal("b")))
+    assert rule != Rule(Nonterminal("S"), [Nonterminal("[[a]]"), Terminal("a")])
+    assert rule != (Nonterminal("S"), Nonterminal("[[a]]"), Terminal("b"))
+    assert len({rule, pickle.loads(pickle.dumps(rule))}) == 1
+    assert str(rule) == "S -> [[a]] b"
+    assert str(Rule(Nonterminal("S"), [])) == "S -> "
+
+
+def test_grammar_equality():
+    rules = [
+        Rule(Nonterminal("S"), [Nonterminal("[[a]]")]),
+        Rule(Nonterminal("[[a]]"), [Terminal("a")]),
+    ]
+    cfg = CFGrammar(Nonterminal("S"), rules)
+    assert cfg == CFGrammar(Nonterminal("S"), rules[::-1])
+    assert cfg.fingerprint() == CFGrammar(Nonterminal("S"), rules[::-1]).fingerprint()
+    assert cfg != CFGrammar(Nonterminal("S"), rules[:1])
+
+
+def test_congruent_class():
+    assert CongruentClass(["acb", "c"]) == CongruentClass({"c", "acb"})
+    assert CongruentClass(["acb", "c"]).rep == "c"
+
+
+def expression_grammar():
+    # E -> E + T | T, T -> ( E ) | a
+    E, T = Nonterminal("E"), Nonterminal("T")
+    return CFGrammar(
+        E,
+        [
+            Rule(E, [E, Terminal("+"), T]),
+            Rule(E, [T]),
+            Rule(T, [Terminal("("), E, Terminal(")")]),
+            Rule(T, [Terminal("a")]),
+        ],
+    )
+
+
+def symbols(strings):
+    return {tuple(map(Terminal, string)) for string in strings}
+
+
+def test_first():
+    cfg = expression_grammar()
+    rules = list(cfg.rules)
+    assert cfg.first(1, [Nonterminal("E")]) == symbols(["(", "a"])
+    assert cfg.first(2, [Nonterminal("E")]) == symbols(["((", "(a", "a", "a+"])
+    assert cfg.first(2, [Terminal("a"), Nonterminal("T")]) == symbols(["a(", "aa"])
+    assert cfg.first(2, []) == {()}
+    assert cfg.first(0, [Nonterminal("E")]) == set()
+    assert cfg.rules == rules
+
+
+def test_follow():
+    cfg = expression_grammar()
+    rules = list(cfg.rules)
+    assert cfg.follow(1, Nonterminal("E")) == symbols(["$", "+", ")"])
+    assert cfg.follow(1, Nonterminal("T")) == symbols(["$", "+", ")"])
+    assert cfg.follow(2, Nonterminal("T")) == symbols(
+        ["$", "+(", "+a", ")$", ")+", "))"]
+    )
+    assert cfg.follow(1, Nonterminal("X")) == set()
+    assert cfg.rules == rules
+
+
+def test_first_follow_cache():
+    cfg = expression_grammar()
+    table = cfg.first_follow(2)
+    assert cfg.first_follow(2) is table
+    assert table._follow_sets is None
+    assert table.follow(Nonterminal("E")) == symbols(
+        ["$", "+(", "+a", ")$", ")+", "))"]
+    )
+    cfg.rules.append(Rule(Nonterminal("T"), [Terminal("b")]))
+    assert cfg.first_follow(2) is not table
+    assert cfg.first(1, [Nonterminal("E")]) == symbols(["(", "a", "b"])
+
+
+def is_in_cnf(cfg):
+    for rule in cfg.rules:
+        if not rule.right:
+            assert rule.left == cfg.start
+        elif len(rule.right) == 1:
+            assert isinstance(rule.right[0], Terminal)
+        else:
+            assert len(rule.right) == 2
+            assert all(isinstance(sym, Nonterminal) for sym in rule.right)
+            assert cfg.start not in rule.right
+    return True
+
+
+def test_to_chomsky_normal_form():
+    # S -> A S B | C with nullable A and C: the words a^i x b^n, i <= n,
+    # where x is "cc" or empty.
+    S, A, B, C = map(Nonterminal, "SABC")
+    cfg = CFGrammar(
+        S,
+        [
+            Rule(S, [A, S, B]),
+            Rule(S, [C]),
+            Rule(A, [Terminal("a")]),
+            Rule(A, []),
+            Rule(B, [Terminal("b")]),
+            Rule(C, [Terminal("c"), Terminal("c")]),
+            Rule(C, []),
+            Rule(Nonterminal("D"), [Nonterminal("E")]),
+        ],
+    )
+    cnf = CFGrammar.to_chomsky_normal_form(cfg)
+    assert is_in_cnf(cnf)
+    assert len(set(cnf.rules)) == len(cnf.rules)
+    assert Nonterminal("D") not in cnf.nonterminals
+
+    def in_language(word):
+        match = re.fullmatch(r"(a*)(cc)?(b*)", word)
+        return bool(match) and len(match[1]) <= len(match[3])
+
+    words = ["".join(chars) for n in range(7) for chars in product("abc", repeat=n)]
+    parser = CKYParser(cnf)
+    assert [parser.accepts(word) for word in words] == list(map(in_language, words))
+
+
+def test_new_nonterminal_names():
+    S = Nonterminal("S")
+    cfg = CFGrammar(
+        S,
+        [Rule(S, [Terminal("a"), Terminal("a"), S, Terminal("b")]), Rule(S, [])],
+    )
+    cnf = CFGrammar.to_chomsky_normal_form(cfg)
+    assert is_in_cnf(cnf)
+    assert len(cnf.nonterminals) == len({nt.symbol for nt in cnf.nonterminals})
+    assert cnf.start not in cfg.nonterminals
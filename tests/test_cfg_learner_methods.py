@@ -174,6 +174,7 @@ def test_strong_learn1():
         ),
     }
 
+
 def test_strong_learn2():
     cfg_learner = CFGLearner()
     cfg = cfg_learner.strong_learn(["ab", "ba", "abab", "abba", "baba", "bbaa"])
@@ -194,4 +195,17 @@ def test_strong_learn2():
         Rule(Nonterminal("[[ab]]"), [Nonterminal("[[a]]"), Nonterminal("[[b]]")]),
         Rule(Nonterminal("[[ab]]"), [Nonterminal("[[b]]"), Nonterminal("[[a]]")]),
         Rule(Nonterminal("[[ab]]"), [Nonterminal("[[ab]]"), Nonterminal("[[ab]]")]),
-    }
\ No newline at end of file
+    }
+
+
+def test_strong_learn_parallel():
+    words = ["ab", "ba", "abab", "abba", "baba", "bbaa"]
+    with CFGLearner(n_jobs=2) as learner:
+        learner.MIN_PARALLEL_CLASSES = 1
+        for idx in range(1, len(words) + 1):
+            serial = CFGLearner().strong_learn(words[:idx])
+            parallel = learner.strong_learn(words[:idx])
+            assert parallel.start == serial.start
+            assert parallel.rules == serial.rules
+        assert learner._pool is not None
+    assert learner._pool is None
@@ -0,0 +1,103 @@
+from benchmarks.bench_cky import legacy_accepts
+from src.cky_parser import CKYParser
+from src.cfg_learner import CFGLearner
+from src.cfg_parser import CFGParser
+from src.cfg import CFGrammar, Nonterminal, Terminal, Rule
+
+
+def anbn_grammar():
+    return CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(Nonterminal("S"), [Nonterminal("[[c]]")]),
+            Rule(Nonterminal("[[a]]"), [Terminal("a")]),
+            Rule(Nonterminal("[[b]]"), [Terminal("b")]),
+            Rule(Nonterminal("[[c]]"), [Terminal("c")]),
+            Rule(
+                Nonterminal("[[c]]"),
+                [Nonterminal("[[a]]"), Nonterminal("[[c]]"), Nonterminal("[[b]]")],
+            ),
+        ],
+    )
+
+
+def test_accepts():
+    cky_parser = CKYParser(anbn_grammar())
+    assert cky_parser.accepts("c")
+    assert cky_parser.accepts("acb")
+    assert cky_parser.accepts("aaacbbb")
+    assert not cky_parser.accepts("ab")
+    assert not cky_parser.accepts("aacb")
+    assert not cky_parser.accepts("")
+
+
+def test_compiled_grammar_is_cached():
+    grammar = anbn_grammar()
+    cky_parser = CKYParser(grammar)
+    compiled = cky_parser.compiled
+    cky_parser.accepts("acb")
+    assert cky_parser.compiled is compiled
+
+    grammar.rules.append(Rule(Nonterminal("S"), []))
+    assert cky_parser.compiled is not compiled
+    assert cky_parser.accepts("")
+
+    cky_parser.grammar = anbn_grammar()
+    assert not cky_parser.accepts("")
+
+
+def test_accepts_matches_reference():
+    words = ["a", "b", "c", "ab", "ba", "abab", "abba", "baba", "bbaa", "aab", "cab"]
+    for grammar in [
+        anbn_grammar(),
+        CFGLearner().weak_learn(["ab", "ba", "abab"]),
+        CFGParser().parse_grammar("tests/generated_grammars/02.txt"),
+    ]:
+        cky_parser = CKYParser(grammar)
+        cnf = CFGrammar.to_chomsky_normal_form(grammar)
+        for word in words:
+            assert cky_parser.accepts(word) == legacy_accepts(cnf, word)
+
+
+def test_accepts_many():
+    words = ["acb", "", "ab", "c", "aacbb", "xcb", "aacb", "ca", "b"]
+    for grammar in [anbn_grammar(), CFGLearner().weak_learn(["c", "acb", "aab"])]:
+        cky_parser = CKYParser(grammar)
+        assert list(cky_parser.accepts_many(words)) == [
+            cky_parser.accepts(word) for word in words
+        ]
+    assert len(CKYParser(anbn_grammar()).accepts_many([])) == 0
+
+
+def test_incremental():
+    cky_parser = CKYParser(anbn_grammar())
+    chart = cky_parser.incremental("aa")
+    assert not chart.accepts()
+
+    fork = chart.fork().extend("cbb")
+    assert fork.accepts()
+    assert len(chart) == 2
+    assert not chart.extend("cb").accepts()
+    assert chart.truncate(3).extend("bb").accepts()
+
+
+def test_accepts_in_context():
+    substrings = ["c", "acb", "ac", "aacbb", "", "b", "acbx"]
+    for grammar in [anbn_grammar(), CFGLearner().weak_learn(["c", "acb", "ab"])]:
+        cky_parser = CKYParser(grammar)
+        for left, right in [("", ""), ("a", "b"), ("aa", "b"), ("", "b")]:
+            assert cky_parser.accepts_in_context(left, right, substrings) == [
+                cky_parser.accepts(left + v + right) for v in substrings
+            ]
+
+
+def test_first_accepted():
+    words = ["ab", "acb", "", "aacbb", "c"]
+    cky_parser = CKYParser(anbn_grammar())
+    spans = {}
+    assert cky_parser.first_accepted(words, spans) == 1
+    assert spans["acb"] == cky_parser.span_cell("acb", {})
+    assert cky_parser.first_accepted(words[:1], spans) is None
+    assert cky_parser.first_accepted([], spans) is None
+    for word in ["aacbb", "aacb", "xc", "cb"]:
+        assert bool(cky_parser.span_cell(word, spans) & 1) == cky_parser.accepts(word)
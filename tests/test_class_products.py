@@ -0,0 +1,29 @@
+from src.class_products import ClassProducts
+from src.cfg import CongruentClass
+
+
+def test_splits():
+    products = ClassProducts()
+    a = CongruentClass(["a", "aab"])
+    b = CongruentClass(["b", "bb"])
+
+    assert products.splits("ab", [a, b])
+    assert products.splits("aabbb", [a, b])
+    assert products.splits("abb", [a, b])
+    assert not products.splits("ba", [a, b])
+    assert not products.splits("a", [a, b])
+    assert not products.splits("abbb", [a, b])
+    assert products.splits("abab", [a, b, a, b])
+
+
+def test_intersects_and_covers():
+    products = ClassProducts()
+    a = CongruentClass(["a"])
+    b = CongruentClass(["b", "ab"])
+    c = CongruentClass(["ab", "aab"])
+
+    assert products.covers(c, [a, b])
+    assert products.intersects(c, [a, b])
+    assert not products.covers(c, [b, a])
+    assert not products.intersects(c, [b, a])
+    assert not products.intersects(CongruentClass(["abab"]), [a, b])
@@ -0,0 +1,54 @@
+from src.congruence_index import CongruenceIndex
+from src.context_index import ContextIndex
+from src.cfg import CongruentClass
+from src.cfg_learner import CFGLearner
+from src.cky_parser import CKYParser
+
+
+def test_add():
+    words = ["c", "acb", "aacbb"]
+    congruence = CongruenceIndex(CKYParser(CFGLearner().weak_learn(words)))
+
+    assert congruence.add("a", "c", "b") == 0
+    assert congruence.add("", "acb", "") == 0
+    assert congruence.add("", "a", "cb") == 1
+    assert congruence.add("aa", "c", "bb") == 0
+    assert congruence.add("", "aacbb", "") == 0
+    assert len(congruence) == 2
+    assert congruence.contexts == [("a", "b"), ("", "cb")]
+    assert set(congruence.classes()) == {
+        CongruentClass(["c", "acb", "aacbb"]),
+        CongruentClass(["a"]),
+    }
+
+
+def test_bounded_spans():
+    words = ["c", "acb", "aacbb", "aaacbbb"]
+    parser = CKYParser(CFGLearner().weak_learn(words))
+    congruence = CongruenceIndex(parser, max_spans=8)
+    expected = CongruenceIndex(CKYParser(CFGLearner().weak_learn(words)))
+    for word in words:
+        for idx in range(len(word)):
+            for end in range(idx + 1, len(word) + 1):
+                triple = (word[:idx], word[idx:end], word[end:])
+                assert congruence.add(*triple) == expected.add(*triple)
+                assert len(congruence.spans) <= 8 + len(word) ** 2
+    assert len(expected.spans) > 8
+    congruence.release()
+    assert congruence.spans == {}
+
+
+def test_add_components():
+    words = ["c", "acb", "aacbb"]
+    index = ContextIndex(words)
+    congruence = CongruenceIndex(components=index.substitution_classes())
+
+    assert congruence.add("a", "acb", "b") == 0
+    assert congruence.class_of["c"] == 0
+    assert congruence.add("", "c", "") == 0
+    assert congruence.add("", "a", "cb") == 1
+    assert set(congruence.classes()) == {
+        CongruentClass(["c", "acb", "aacbb"]),
+        CongruentClass(["a"]),
+    }
+    assert congruence.classes()[0].rep == "c"
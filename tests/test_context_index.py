@@ -0,0 +1,33 @@
+from src.context_index import ContextIndex
+
+
+def test_context_index():
+    index = ContextIndex(["c", "acb"])
+    assert len(index) == 7
+    assert index.substrings() == {"a", "b", "c", "ac", "cb", "acb"}
+    assert index.contexts("c") == {("", ""), ("a", "b")}
+    assert index.contexts("x") == set()
+    assert index.substitutable(("", "")) == {"c", "acb"}
+    assert list(index.substitutable_pairs()) in (
+        [("c", "acb"), ("acb", "c")],
+        [("acb", "c"), ("c", "acb")],
+    )
+
+    index.add("acb")
+    assert len(index) == 7
+    index.add("ab")
+    assert index.substitutable(("a", "")) == {"b", "cb"}
+    assert ("b", "cb") in set(index.substitutable_pairs())
+
+
+def test_context_index_from_string():
+    assert ContextIndex("ab").substrings() == {"a", "b", "ab"}
+    assert len(ContextIndex([])) == 0
+
+
+def test_substitution_classes():
+    classes = ContextIndex(["c", "acb", "aacbb"]).substitution_classes()
+    assert len(classes) == 9
+    assert set(classes.members("aacbb")) == {"c", "acb", "aacbb"}
+    assert classes.representative("aacbb") == "c"
+    assert set(classes.members("aacb")) == {"ac", "aacb"}
@@ -0,0 +1,21 @@
+from src.disjoint_set import DisjointSet
+
+
+def test_union_find():
+    sets = DisjointSet(["bb", "a", "ab", "c"], key=lambda x: (len(x), x))
+    assert len(sets) == 4
+    assert sets.find("a") == "a"
+
+    sets.union("bb", "ab")
+    sets.union("ab", "c")
+    assert len(sets) == 2
+    assert sets.find("bb") == sets.find("c")
+    assert sets.find("a") != sets.find("c")
+    assert set(sets.members("bb")) == {"bb", "ab", "c"}
+    assert sets.representative("ab") == "c"
+    assert sorted(sets.groups()) == [("a", ["a"]), ("c", sets.members("c"))]
+
+    assert "d" not in sets
+    sets.union("d", "a")
+    assert "d" in sets
+    assert sets.representative("d") == "a"
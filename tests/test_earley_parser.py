@@ -0,0 +1,99 @@
+from src.cky_parser import CKYParser
+from src.earley_parser import EarleyParser
+from src.cfg_learner import CFGLearner
+from src.cfg_parser import CFGParser
+from src.cfg import CFGrammar, Nonterminal, Terminal, Rule
+from src.membership_cache import MembershipCache
+
+import pytest
+
+
+def dyck_grammar():
+    # Nullable start, empty rule and a rule of length four.
+    return CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(
+                Nonterminal("S"),
+                [Terminal("a"), Nonterminal("S"), Terminal("b"), Nonterminal("S")],
+            ),
+            Rule(Nonterminal("S"), []),
+        ],
+    )
+
+
+def unit_grammar():
+    # Unit rules, a nullable nonterminal in the middle and a unit cycle.
+    return CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(Nonterminal("S"), [Nonterminal("A")]),
+            Rule(Nonterminal("A"), [Nonterminal("S")]),
+            Rule(Nonterminal("A"), [Terminal("a"), Nonterminal("E"), Terminal("b")]),
+            Rule(Nonterminal("A"), [Nonterminal("A"), Nonterminal("E"), Terminal("c")]),
+            Rule(Nonterminal("E"), []),
+            Rule(Nonterminal("E"), [Terminal("e")]),
+        ],
+    )
+
+
+def test_accepts():
+    earley_parser = EarleyParser(dyck_grammar())
+    assert earley_parser.accepts("")
+    assert earley_parser.accepts("ab")
+    assert earley_parser.accepts("aabbab")
+    assert not earley_parser.accepts("a")
+    assert not earley_parser.accepts("ba")
+    assert not earley_parser.accepts("abx")
+
+    earley_parser = EarleyParser(unit_grammar())
+    assert earley_parser.accepts("ab")
+    assert earley_parser.accepts("aebc")
+    assert earley_parser.accepts("abcec")
+    assert not earley_parser.accepts("")
+    assert not earley_parser.accepts("aeeb")
+
+
+def test_accepts_matches_cky():
+    words = ["", "a", "b", "c", "ab", "ba", "abab", "abba", "aabb", "acb", "abcc"]
+    for grammar in [
+        dyck_grammar(),
+        unit_grammar(),
+        CFGLearner().weak_learn(["ab", "ba", "abab"]),
+        CFGLearner().strong_learn(["c", "acb", "aacbb"]),
+        CFGParser().parse_grammar("tests/generated_grammars/02.txt"),
+    ]:
+        cky_parser = CKYParser(grammar)
+        earley_parser = EarleyParser(grammar)
+        for word in words:
+            assert earley_parser.accepts(word) == cky_parser.accepts(word)
+
+
+def test_tables_are_cached():
+    grammar = dyck_grammar()
+    earley_parser = EarleyParser(grammar)
+    tables = earley_parser.tables
+    earley_parser.accepts("ab")
+    assert earley_parser.tables is tables
+
+    grammar.rules.append(Rule(Nonterminal("S"), [Terminal("c")]))
+    assert earley_parser.tables is not tables
+    assert earley_parser.accepts("c")
+
+
+def test_backend():
+    words = ["", "ab", "aabb", "abba", "ababab", "b"]
+    cache = MembershipCache()
+    cky_parser = CKYParser(dyck_grammar(), cache)
+    earley_parser = CKYParser(dyck_grammar(), cache, backend="earley")
+    assert earley_parser.fingerprint == cky_parser.fingerprint
+    expected = [cky_parser.accepts(word) for word in words]
+    assert list(earley_parser.accepts_many(words)) == expected
+    assert earley_parser.parses == 0
+    assert list(CKYParser(dyck_grammar(), backend="earley").accepts_many(words)) == (
+        expected
+    )
+    assert earley_parser._compiled is None
+
+    with pytest.raises(ValueError):
+        CKYParser(dyck_grammar(), backend="glr")
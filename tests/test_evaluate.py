@@ -0,0 +1,24 @@
+from src.evaluate import aggregate, load_results, run
+
+import json
+
+
+def test_run_and_resume(tmp_path):
+    grammar = tmp_path / "anbn.txt"
+    grammar.write_text("S -> [[x]]\n[[x]] -> a [[x]] b\n[[x]] -> a b\n")
+    output = tmp_path / "results.jsonl"
+
+    results = run([str(grammar)], [1, 2], output, n_words=20)
+    assert [r["size"] for r in results] == [1, 2]
+    assert load_results(output) == results
+
+    with open(output, mode="a", encoding="utf-8") as file:
+        file.write('{"grammar": "trunc')
+    results = run([str(grammar)], [1, 2, 3], output, n_words=20, resume=True)
+    assert [r["size"] for r in results] == [1, 2, 3]
+    assert [json.loads(line)["size"] for line in open(output)] == [1, 2, 3]
+
+    sizes, grammars = aggregate(results)
+    assert sizes[2]["jobs"] == 1
+    assert grammars[str(grammar)]["learned_at"] == 2
+    assert sizes[1]["learned"] == 0
@@ -1,4 +1,4 @@
-from src.cfg_learner import CFGLearner
+from src.incremental_learner import IncrementalLearner
 from src.cky_parser import CKYParser
 from src.cfg_parser import CFGParser
 from src.utils import get_words_from_grammar
@@ -16,17 +16,17 @@ def test_from_generated_grammars():
 
     for path in grammar_paths:
         target_cfg = CFGParser().parse_grammar(path)
-        words = get_words_from_grammar(target_cfg)[:1000]
-        cfg_learner = CFGLearner()
+        words = get_words_from_grammar(target_cfg, max_count=1000)
+        cfg_learner = IncrementalLearner()
 
         print("\n" + "=" * 50 + "\n")
         print(str(path), end="\n\n")
         print(words[: max_words + 1])
 
         for idx in range(1, max_words + 1):
-            cfg = cfg_learner.strong_learn(words[:idx])
+            cfg = cfg_learner.add_words(words[idx - 1 : idx])
             cky_parser = CKYParser(cfg)
-            correct = sum(cky_parser.accepts(word) for word in words)
+            correct = cky_parser.accepts_many(words).sum()
             print(f"Accuracy of grammar learned by {idx} words: {correct/len(words)}")
             if correct == len(words):
                 total_learned += 1
@@ -0,0 +1,30 @@
+from src.cfg_learner import CFGLearner
+from src.cky_parser import CKYParser
+from src.context_index import ContextIndex
+from src.incremental_learner import IncrementalLearner
+
+
+def test_add_words():
+    words = ["ab", "ba", "abab", "abba", "baba", "bbaa", "aabb"]
+    learner = IncrementalLearner()
+
+    for idx in range(1, len(words) + 1):
+        cfg = learner.add_words(words[idx - 1 : idx])
+        assert cfg == CFGLearner().strong_learn(words[:idx])
+
+    assert learner.add_words("ab") == cfg
+    assert learner.words == words
+
+
+def test_substitution_grammar():
+    words = ["c", "acb", "aacbb", "ab"]
+    index = ContextIndex(words)
+    learner = CFGLearner()
+    weak_cfg = learner.weak_learn(words, index)
+    merged = learner._substitution_grammar(words, index, index.substitution_classes())
+
+    assert len(merged.nonterminals) < len(weak_cfg.nonterminals)
+    tests = ["", "c", "ab", "acb", "aabb", "aacb", "aaacbbb", "bca", "aab"]
+    assert list(CKYParser(merged).accepts_many(tests)) == list(
+        CKYParser(weak_cfg).accepts_many(tests)
+    )
@@ -0,0 +1,65 @@
+from src.cfg_learner import CFGLearner
+from src.learning_budget import BudgetExceeded, LearningBudget, LearningState
+
+import pytest
+
+
+def test_budget_check():
+    budget = LearningBudget(parses=2).start()
+    budget.used_parses = 2
+    budget.check()
+    budget.used_parses = 3
+    with pytest.raises(BudgetExceeded) as exc:
+        budget.check()
+    assert exc.value.reason == "parses"
+
+    budget = LearningBudget(seconds=0, check_every=1).start()
+    with pytest.raises(BudgetExceeded):
+        list(budget.watch(range(3)))
+    assert list(LearningBudget().watch(range(3))) == [0, 1, 2]
+
+
+def test_memory_budget():
+    budget = LearningBudget(memory=32 << 20).start()
+    assert budget.exhausted() is None
+    data = b"x" * (64 << 20)
+    assert budget.exhausted() == "memory"
+    del data
+    # The peak of an earlier run does not count against a new one.
+    assert LearningBudget(memory=32 << 20).start().exhausted() is None
+
+
+def test_resume():
+    words = ["c", "acb", "aacbb"]
+    expected = CFGLearner().strong_learn(words)
+    learner = CFGLearner()
+
+    with pytest.raises(BudgetExceeded) as exc:
+        learner.strong_learn(words, budget=LearningBudget(parses=2))
+    state = exc.value.state
+    assert state.stage == "congruent_classes"
+    assert state.weak_cfg is not None and state.classes is None
+    assert "congruent_classes" in str(exc.value)
+
+    learner.cache.clear()
+    cfg = learner.strong_learn(words, budget=LearningBudget(parses=100), state=state)
+    assert cfg == expected
+    assert state.stage == "done"
+
+    with pytest.raises(ValueError):
+        learner.strong_learn(["ab"], state=state)
+
+
+def test_learn_within():
+    words = ["c", "acb", "aacbb"]
+    learner = CFGLearner()
+
+    result = learner.learn_within(words, LearningBudget(parses=0))
+    assert not result.complete
+    assert result.reason == "parses"
+    assert result.grammar == learner.weak_learn(words)
+
+    result = learner.learn_within(words, LearningBudget(seconds=60), result.state)
+    assert result.complete
+    assert result.grammar == CFGLearner().strong_learn(words)
+    assert isinstance(result.state, LearningState)
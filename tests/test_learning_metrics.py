@@ -0,0 +1,42 @@
+from src.cfg_learner import CFGLearner
+from src.learning_metrics import LearningMetrics
+
+
+def test_stage():
+    seen = []
+    metrics = LearningMetrics([lambda name, seconds, m: seen.append(name)])
+    with metrics.stage("a"):
+        pass
+    with metrics.stage("a"):
+        pass
+    metrics.count("items", 3)
+    assert seen == ["a", "a"]
+    assert list(metrics.times) == ["a"]
+    assert metrics.as_dict()["counts"] == {"items": 3}
+    assert "items" in metrics.report()
+
+
+def test_learn_with_metrics(tmp_path):
+    learner = CFGLearner()
+    words = ["c", "acb", "aacbb"]
+    cfg, metrics = learner.learn_with_metrics(words, profile_dir=tmp_path)
+
+    assert cfg == CFGLearner().strong_learn(words)
+    assert list(metrics.times) == [
+        "weak_learn",
+        "congruent_classes",
+        "primality",
+        "decomposition",
+        "branching",
+        "rules",
+    ]
+    assert metrics.counts["substrings"] == 13
+    assert metrics.counts["classes"] == 9
+    assert metrics.counts["rules"] == len(cfg.rules)
+    assert metrics.counts["parses"] > 0
+    assert metrics.cache["misses"] == metrics.counts["parses"]
+    assert (tmp_path / "congruent_classes.prof").exists()
+
+    _, metrics = learner.learn_with_metrics(words)
+    assert metrics.counts["parses"] == 0
+    assert metrics.cache["misses"] == 0
@@ -0,0 +1,79 @@
+from src.cky_parser import CKYParser
+from src.matrix_parser import MatrixParser
+from src.cfg_learner import CFGLearner
+from src.cfg_parser import CFGParser
+from src.cfg import CFGrammar, Nonterminal, Terminal, Rule
+
+import random
+
+import pytest
+
+
+def dyck_grammar():
+    return CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(
+                Nonterminal("S"),
+                [Terminal("a"), Nonterminal("S"), Terminal("b"), Nonterminal("S")],
+            ),
+            Rule(Nonterminal("S"), []),
+        ],
+    )
+
+
+def dyck_word(length, rng):
+    word, depth = "", 0
+    for idx in range(length):
+        if depth and (rng.random() < 0.5 or depth >= length - idx):
+            word, depth = word + "b", depth - 1
+        else:
+            word, depth = word + "a", depth + 1
+    return word + "b" * depth
+
+
+def test_accepts_matches_cky():
+    rng = random.Random(0)
+    words = ["", "a", "ab", "ba", "abab", "abba", "aabb", "acb", "aacbb"]
+    words += [
+        "".join(rng.choice("abc") for _ in range(rng.randint(5, 40))) for _ in range(20)
+    ]
+    for grammar in [
+        dyck_grammar(),
+        CFGLearner().weak_learn(["ab", "ba", "abab"]),
+        CFGLearner().strong_learn(["c", "acb", "aacbb"]),
+        CFGParser().parse_grammar("tests/generated_grammars/02.txt"),
+    ]:
+        cky_parser = CKYParser(grammar, matrix_length=None)
+        for leaf in [1, 2, 16]:
+            matrix_parser = MatrixParser(cky_parser.compiled, leaf)
+            for word in words:
+                assert matrix_parser.accepts(word) == cky_parser.accepts(word)
+
+
+def test_long_words():
+    rng = random.Random(0)
+    words = [dyck_word(length, rng) for length in [100, 300]]
+    words += [word[:-1] + "a" for word in words]
+    cky_parser = CKYParser(dyck_grammar(), matrix_length=64)
+    assert list(cky_parser.accepts_many(words)) == [True, True, False, False]
+    earley_parser = CKYParser(dyck_grammar(), backend="earley")
+    assert list(earley_parser.accepts_many(words)) == [True, True, False, False]
+
+
+def test_chart_limit():
+    rng = random.Random(0)
+    word = dyck_word(300, rng)
+    cky_parser = CKYParser(dyck_grammar())
+    assert cky_parser.matrix_length is None
+    assert cky_parser.accepts(word)
+    assert not cky_parser.accepts(word + "a")
+
+    matrix_parser = MatrixParser(cky_parser.compiled, max_cells=1000)
+    assert matrix_parser.accepts(dyck_word(6, rng))
+    with pytest.raises(ValueError):
+        matrix_parser.accepts(word)
+    limited = CKYParser(dyck_grammar(), matrix_length=64)
+    limited.matrix.max_cells = 1000
+    assert not limited._is_long(word)
+    assert limited.accepts(word)
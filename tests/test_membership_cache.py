@@ -0,0 +1,61 @@
+from src.membership_cache import MembershipCache
+from src.cky_parser import CKYParser
+from src.cfg_learner import CFGLearner
+
+
+def test_lru_eviction():
+    cache = MembershipCache(max_entries=2)
+    cache.put("g", "a", True)
+    cache.put("g", "b", False)
+    assert cache.get("g", "a") is True
+    cache.put("g", "c", True)
+    assert cache.get("g", "b") is None
+    assert cache.get("g", "c") is True
+    assert cache.stats() == {
+        "entries": 2,
+        "chars": 2,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+    cache = MembershipCache(max_chars=5)
+    cache.put("g", "abc", True)
+    cache.put("g", "abcd", True)
+    assert len(cache) == 1
+    assert cache.get("g", "abc") is None
+
+
+def test_shared_between_equal_grammars():
+    cache = MembershipCache()
+    learner = CFGLearner()
+    cky_parser = CKYParser(learner.weak_learn(["c", "acb"]), cache)
+    other_parser = CKYParser(learner.weak_learn(["c", "acb"]), cache)
+
+    assert cky_parser.accepts("aacbb")
+    assert other_parser.accepts("aacbb")
+    assert list(other_parser.accepts_many(["aacbb", "ab"])) == [True, False]
+    assert cache.hits == 2
+    assert cache.misses == 2
+
+
+def test_accepts_many_remembers_bools():
+    answers = []
+
+    class RecordingCache(MembershipCache):
+        def put(self, fingerprint, word, accepted):
+            answers.append(accepted)
+            super().put(fingerprint, word, accepted)
+
+    cky_parser = CKYParser(CFGLearner().weak_learn(["c", "acb"]), RecordingCache())
+    assert list(cky_parser.accepts_many(["aacbb", "ab", ""])) == [True, False, False]
+    assert answers and all(type(accepted) is bool for accepted in answers)
+
+
+def test_strong_learn_reuses_answers():
+    learner = CFGLearner()
+    cfg = learner.strong_learn(["c", "acb", "aacbb"])
+    misses = learner.cache.misses
+    assert learner.strong_learn(["c", "acb", "aacbb"]) == cfg
+    assert learner.cache.misses == misses
+    assert learner.cache.hits > 0
@@ -0,0 +1,121 @@
+from src.cky_parser import CKYParser
+from src.cfg_learner import CFGLearner
+from src.cfg import CFGrammar, Nonterminal, Terminal, Rule
+
+from math import comb, inf
+
+import pytest
+
+
+def catalan(n):
+    return comb(2 * n, n) // (n + 1)
+
+
+def concatenation_grammar():
+    # S -> S S | a: a word of n symbols has catalan(n - 1) derivations.
+    return CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(Nonterminal("S"), [Nonterminal("S"), Nonterminal("S")]),
+            Rule(Nonterminal("S"), [Terminal("a")]),
+        ],
+    )
+
+
+def test_count():
+    cky_parser = CKYParser(concatenation_grammar())
+    for n in range(1, 8):
+        assert cky_parser.parse_forest("a" * n).count() == catalan(n - 1)
+    forest = cky_parser.parse_forest("a" * 60)
+    assert forest.count() == catalan(59)
+    assert len(forest) <= 60 * 61 // 2
+
+    assert cky_parser.parse_forest("").count() == 0
+    assert cky_parser.parse_forest("ab").count() == 0
+    assert not cky_parser.parse_forest("ab")
+
+
+def test_trees():
+    forest = CKYParser(concatenation_grammar()).parse_forest("aaaaa")
+    trees = list(forest.trees())
+    assert len(trees) == forest.count() == 14
+    assert len(set(map(str, trees))) == 14
+    assert all(tree.leaves() == list("aaaaa") for tree in trees)
+    assert [forest.tree(idx) for idx in range(14)] == trees
+    with pytest.raises(IndexError):
+        forest.tree(14)
+
+
+def test_unambiguous():
+    grammar = CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(Nonterminal("S"), [Terminal("a"), Nonterminal("S"), Terminal("b")]),
+            Rule(Nonterminal("S"), []),
+        ],
+    )
+    cky_parser = CKYParser(grammar)
+    for n in range(4):
+        forest = cky_parser.parse_forest("a" * n + "b" * n)
+        assert forest.count() == 1
+        assert not forest.is_ambiguous()
+        assert "".join(next(forest.trees()).leaves()) == "a" * n + "b" * n
+
+
+def test_source_rules():
+    # Derivations are those of the grammar itself, not of its CNF.
+    S, A, B, X = map(Nonterminal, "SABX")
+    grammar = CFGrammar(
+        start=S,
+        rules=[
+            Rule(S, [A]),
+            Rule(S, [B]),
+            Rule(S, [Terminal("c"), X, Terminal("d"), X]),
+            Rule(A, [Terminal("a")]),
+            Rule(B, [Terminal("a")]),
+            Rule(X, []),
+            Rule(X, [Terminal("b")]),
+        ],
+    )
+    cky_parser = CKYParser(grammar)
+    forest = cky_parser.parse_forest("a")
+    assert forest.count() == 2
+    assert [str(tree) for tree in forest.trees()] == ["(S (A a))", "(S (B a))"]
+
+    assert cky_parser.parse_forest("cd").count() == 1
+    assert str(cky_parser.parse_forest("cd").tree(0)) == "(S c (X ) d (X ))"
+    assert cky_parser.parse_forest("cdb").count() == 1
+    assert str(cky_parser.parse_forest("cbdb").tree(0)) == "(S c (X b) d (X b))"
+    assert cky_parser.parse_forest("cbb").count() == 0
+
+
+def test_cycles():
+    # Unit cycles S -> A -> S give every word infinitely many derivations.
+    S, A = Nonterminal("S"), Nonterminal("A")
+    grammar = CFGrammar(
+        start=S,
+        rules=[Rule(S, [A]), Rule(A, [S]), Rule(A, [Terminal("a")])],
+    )
+    forest = CKYParser(grammar).parse_forest("a")
+    assert forest.count() == inf
+    assert forest.is_ambiguous()
+    with pytest.raises(ValueError):
+        next(forest.trees())
+    with pytest.raises(ValueError):
+        forest.tree(0)
+
+
+def test_matches_accepts():
+    words = ["a", "ab", "ba", "abab", "abba", "baba", "bbaa", "ababab", "c", "acb"]
+    for grammar in [
+        CFGLearner().weak_learn(["ab", "ba", "abab"]),
+        CFGLearner().strong_learn(["c", "acb", "aacbb"]),
+        CFGLearner().strong_learn(["ab", "ba", "abab", "abba", "baba", "bbaa"]),
+    ]:
+        cky_parser = CKYParser(grammar)
+        for word in words:
+            forest = cky_parser.parse_forest(word)
+            assert bool(forest) == cky_parser.accepts(word)
+            if forest.count() != inf:
+                assert len(list(forest.trees())) == forest.count()
+                assert all("".join(tree.leaves()) == word for tree in forest.trees())
@@ -0,0 +1,28 @@
+from src.prime_decomposition import PrimeDecomposition
+from src.cfg import CongruentClass
+
+import pytest
+
+
+def test_decompose():
+    a = CongruentClass(["a"])
+    b = CongruentClass(["b"])
+    c = CongruentClass(["c", "acb"])
+    decomposition = PrimeDecomposition([a, b, c])
+
+    assert list(decomposition.segments("acb", 0)) == [(1, a), (3, c)]
+    assert decomposition.decompose("c") == [c]
+    assert decomposition.decompose("ac") == [a, c]
+    assert decomposition.decompose("aacbb") == [a, c, b]
+    assert decomposition.decompose_all([CongruentClass(["cb", "acbb"]), c]) == {
+        "cb": [c, b],
+        "c": [c],
+    }
+
+
+def test_decompose_missing():
+    decomposition = PrimeDecomposition([CongruentClass(["a"])])
+    with pytest.raises(ValueError):
+        decomposition.decompose("ab")
+    with pytest.raises(ValueError):
+        decomposition.decompose("")
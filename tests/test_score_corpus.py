@@ -0,0 +1,37 @@
+from src.cfg_parser import CFGParser
+from src.score_corpus import batches, read_words, score_corpus
+
+
+def test_read_words(tmp_path):
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_bytes(b"ab\r\naabb\n\nba\n")
+    assert list(read_words(corpus, buffer_size=4)) == ["ab", "aabb", "", "ba"]
+
+
+def test_batches():
+    words = ["a" * n for n in [1, 2, 3, 1, 10, 1]]
+    assert [len(batch) for batch in batches(words, 4)] == [4, 2]
+    assert [len(batch) for batch in batches(words, 4, max_spans=14)] == [3, 1, 1, 1]
+    assert list(batches([], 4)) == []
+
+
+def test_score_corpus(tmp_path):
+    grammar = tmp_path / "anbn.txt"
+    grammar.write_text("S -> [[x]]\n[[x]] -> a [[x]] b\n[[x]] -> a b\n")
+    words = ["a" * n + "b" * n for n in range(1, 30)] + ["ba", "aab", "abab"]
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("\n".join(words * 10) + "\n")
+
+    reports = []
+    for backend in ["cky", "earley"]:
+        stats = score_corpus(
+            CFGParser().parse_grammar(grammar),
+            corpus,
+            batch_size=7,
+            backend=backend,
+            callback=lambda stats: reports.append(stats.words),
+        )
+        assert stats.words == 320
+        assert stats.accepted == 290
+        assert stats.as_dict()["accuracy"] == 290 / 320
+    assert reports[:3] == [7, 14, 21]
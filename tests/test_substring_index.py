@@ -0,0 +1,48 @@
+from src.substring_index import SubstringIndex
+
+
+def test_substrings():
+    words = ["abab", "bab", "abba", ""]
+    index = SubstringIndex(words)
+    texts = [index.text(x) for x in index.substrings()]
+    assert len(texts) == len(set(texts))
+    assert set(texts) == {
+        word[i:j]
+        for word in words
+        for i in range(len(word))
+        for j in range(i + 1, len(word) + 1)
+    }
+    assert index.find("bb") is not None
+    assert index.find("aa") is None
+    assert index.text(index.find("bab")) == "bab"
+
+
+def test_spans_and_contexts():
+    index = SubstringIndex(["abab", "bab"])
+    word_id = index.word_ids["abab"]
+    spans = list(index.spans(word_id))
+    assert len(spans) == 10
+    for i, j, substring_id in spans:
+        assert index.text(substring_id) == "abab"[i:j]
+        assert index.prefix(index.prefix_nodes[word_id][i]) == "abab"[:i]
+        assert index.suffix(index.suffix_nodes[word_id][j]) == "abab"[j:]
+
+
+def test_splits():
+    index = SubstringIndex(["aabab", "babba"])
+    for substring_id in index.substrings():
+        text = index.text(substring_id)
+        assert [
+            (index.text(left), index.text(right))
+            for left, right in index.splits(substring_id)
+        ] == [(text[:k], text[k:]) for k in range(1, len(text))]
+
+
+def test_ids_are_stable():
+    index = SubstringIndex(["abab"])
+    ids = {index.text(x): x for x in index.substrings()}
+    index.add("babba")
+    index.add("abab")
+    assert len(index.words) == 2
+    for text, substring_id in ids.items():
+        assert index.find(text) == substring_id
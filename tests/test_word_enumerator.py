@@ -0,0 +1,96 @@
+from src.cky_parser import CKYParser
+from src.cfg_parser import CFGParser
+from src.cfg import CFGrammar, Nonterminal, Terminal, Rule
+from src.word_enumerator import WordEnumerator
+
+from itertools import product
+
+
+def anbn_grammar():
+    return CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(Nonterminal("S"), [Terminal("a"), Nonterminal("S"), Terminal("b")]),
+            Rule(Nonterminal("S"), []),
+        ],
+    )
+
+
+def test_words():
+    words = list(WordEnumerator(anbn_grammar()).words(max_count=4))
+    assert words == ["", "ab", "aabb", "aaabbb"]
+    words = list(WordEnumerator(anbn_grammar()).words(max_length=5))
+    assert words == ["", "ab", "aabb"]
+    assert list(WordEnumerator(anbn_grammar()).words(max_count=1)) == [""]
+
+
+def test_finite_language():
+    grammar = CFGrammar(
+        start=Nonterminal("S"),
+        rules=[
+            Rule(Nonterminal("S"), [Nonterminal("A"), Nonterminal("A")]),
+            Rule(Nonterminal("A"), [Terminal("a")]),
+            Rule(Nonterminal("A"), [Terminal("b")]),
+            Rule(Nonterminal("A"), [Terminal("a"), Terminal("b")]),
+        ],
+    )
+    enumerator = WordEnumerator(grammar)
+    assert enumerator.longest == 4
+    words = list(enumerator.words())
+    assert len(words) == len(set(words))
+    assert sorted(words) == sorted(
+        {x + y for x, y in product(["a", "b", "ab"], repeat=2)}
+    )
+    assert [len(word) for word in words] == sorted(map(len, words))
+
+
+def test_same_order_in_every_run():
+    # Unit rules are closed over in the CNF; the order of the words must not
+    # depend on where the nonterminals happen to be allocated.
+    def grammar():
+        S, A, C = Nonterminal("S"), Nonterminal("[[A]]"), Nonterminal("[[C]]")
+        return CFGrammar(
+            start=S,
+            rules=[
+                Rule(S, [Terminal("b"), Terminal("b"), Terminal("a")]),
+                Rule(S, []),
+                Rule(S, [C, A, Terminal("b")]),
+                Rule(A, [S]),
+                Rule(A, [Terminal("a")]),
+                Rule(C, [A]),
+                Rule(C, [C, C]),
+            ],
+        )
+
+    expected = list(WordEnumerator(grammar()).words(7))
+    for idx in range(20):
+        others = [Nonterminal(f"X{idx}_{n}") for n in range(7 * idx)]
+        assert list(WordEnumerator(grammar()).words(7)) == expected
+        assert len(others) == 7 * idx
+
+
+def test_deep_grammar():
+    # A chain of 5000 nonterminals is deeper than the recursion limit.
+    chain = [Nonterminal(f"A{idx}") for idx in range(5000)]
+    rules = [Rule(chain[-1], [Terminal("a")])]
+    rules += [Rule(x, [Terminal("a"), y]) for x, y in zip(chain, chain[1:])]
+    enumerator = WordEnumerator(CFGrammar(chain[0], rules))
+    assert enumerator.longest == 5000
+    assert list(enumerator.words(max_length=50)) == []
+
+    rules.append(Rule(chain[-1], [Terminal("a"), chain[0]]))
+    assert WordEnumerator(CFGrammar(chain[0], rules)).longest is None
+
+
+def test_all_short_words():
+    grammar = CFGParser().parse_grammar("tests/generated_grammars/02.txt")
+    words = list(WordEnumerator(grammar).words(max_length=6))
+    alphabet = sorted({char for word in words for char in word})
+    cky_parser = CKYParser(grammar)
+    for length in range(7):
+        expected = {
+            "".join(chars)
+            for chars in product(alphabet, repeat=length)
+            if cky_parser.accepts("".join(chars))
+        }
+        assert {word for word in words if len(word) == length} == expected